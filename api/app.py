@@ -1,11 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import router
+from api.batching import predict_batcher
+from api.concurrency import shutdown_executors
+from src.prediction.assign_developer import get_assigner
+from database.db_connection import dispose_async_engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bind the port right away; the model warms up in the background and
+    # /health reports readiness until then
+    get_assigner().load_in_background()
+    yield
+    predict_batcher.stop()
+    shutdown_executors()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="Bug Triaging ML API",
     description="API for predicting bug assignees using ML",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import Counter
+from fastapi import HTTPException
+from src.config import config
+from api.concurrency import run_inference
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class MicroBatcher:
+    """Coalesces concurrent single-report predictions into one model call.
+
+    Requests are queued; a collector takes the first waiting request, then
+    keeps gathering for up to `window_ms` or until `max_batch` reports, and
+    sends the batch through run_inference (one transform + predict_proba).
+    Each caller's future gets its own row back. At most `max_in_flight`
+    batches run at once, so under load the queue grows and batches get
+    bigger instead of the pool being flooded with tiny jobs.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int, max_queue: int, max_in_flight: int):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_in_flight = max_in_flight
+        self._queue = None
+        self._task = None
+        self._slots = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = Counter()
+
+    def _ensure_started(self):
+        # Bound to the running loop; restarted if that loop has changed or the task died
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._task = loop.create_task(self._collect())
+
+    async def submit(self, title: str, body: str):
+        """Queue one report and wait for its (auto_tags, predictions, signature)."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(((title, body), future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Prediction queue full, retry shortly", headers={"Retry-After": "1"})
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Grab whatever else is already waiting, without waiting any longer
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            loop.create_task(self._run(batch))
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.batched_requests += len(batch)
+        self.batch_sizes[bucket_for(len(batch))] += 1
+        try:
+            tags, results, signatures = await run_inference([report for report, _ in batch])
+            if len(results) != len(batch):
+                # Model not loaded / failed: every caller sees an empty prediction
+                results = [[] for _ in batch]
+            for (_, future), item_tags, item_results, sig in zip(batch, tags, results, signatures):
+                if not future.done():
+                    future.set_result((item_tags, item_results, sig))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        histogram = {f"<={bound}": self.batch_sizes.get(bound, 0) for bound in BATCH_SIZE_BUCKETS}
+        histogram[f">{BATCH_SIZE_BUCKETS[-1]}"] = self.batch_sizes.get(None, 0)
+        return {
+            "enabled": config.API_MICRO_BATCHING,
+            "window_ms": self.window * 1000.0,
+            "max_batch": self.max_batch,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "mean_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+            "batch_size_histogram": histogram
+        }
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+def bucket_for(size: int):
+    for bound in BATCH_SIZE_BUCKETS:
+        if size <= bound:
+            return bound
+    return None
+
+predict_batcher = MicroBatcher(
+    config.API_BATCH_WINDOW_MS,
+    config.API_BATCH_MAX_SIZE,
+    config.API_BATCH_MAX_QUEUE,
+    max_in_flight=config.API_INFERENCE_WORKERS
+)
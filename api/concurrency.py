@@ -0,0 +1,152 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException
+from src.config import config
+from src.prediction.assign_developer import DeveloperAssigner, get_assigner, prediction_cache
+from src.prediction.model_registry import registry
+from src.preprocessing.nlp_preprocessor import generate_tags, lemma_cache_stats
+from api.similarity import bug_signature
+
+class BoundedExecutor:
+    """Runs blocking calls on a pool without tying up the event loop.
+
+    At most `max_pending` jobs may be queued or running at once; beyond that
+    callers get a 503 straight away instead of piling up behind the pool.
+    """
+
+    def __init__(self, name: str, factory, max_pending: int):
+        self.name = name
+        self.max_pending = max_pending
+        self.pending = 0
+        self._factory = factory
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        # Created on first use so importing the API never forks workers
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy ({self.name} queue full), retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+def _inference_pool():
+    if config.API_INFERENCE_EXECUTOR == "thread":
+        return ThreadPoolExecutor(max_workers=config.API_INFERENCE_WORKERS, thread_name_prefix="inference")
+    return ProcessPoolExecutor(max_workers=config.API_INFERENCE_WORKERS)
+
+db_executor = BoundedExecutor(
+    "database",
+    lambda: ThreadPoolExecutor(max_workers=config.API_DB_WORKERS, thread_name_prefix="db"),
+    config.API_MAX_PENDING
+)
+inference_executor = BoundedExecutor("inference", _inference_pool, config.API_MAX_PENDING)
+
+# Model held by this inference worker (process pool) - see _worker_assigner
+_worker_model = None
+
+def _worker_assigner(version: str) -> DeveloperAssigner:
+    """The assigner for `version` inside the current worker.
+
+    Forked workers inherit the parent's loaded model, so this is normally a
+    no-op; after a hot-swap the worker loads the new version once and keeps it.
+    """
+    global _worker_model
+    if _worker_model is not None and _worker_model.version == version:
+        return _worker_model
+    live = get_assigner()
+    if live.is_ready and live.version == version:
+        _worker_model = live
+    else:
+        bundle_dir = registry.version_dir(version) if registry.has_version(version) else None
+        _worker_model = DeveloperAssigner(autoload=False, bundle_dir=bundle_dir, version=version)
+        _worker_model.load_models()
+        prediction_cache.clear()
+    return _worker_model
+
+def _tag_and_predict_with(assigner, reports, top_n):
+    tags = [generate_tags(f"{title} {body}") for title, body in reports]
+    results, clean_texts = assigner.predict_many_with_text(reports, top_n=top_n)
+    # MinHash signatures for near-duplicate detection, from the text the model just preprocessed
+    signatures = [bug_signature(title, body, clean) for (title, body), clean in zip(reports, clean_texts)]
+    return tags, results, signatures
+
+def tag_and_predict(reports, version: str, top_n: int = 5):
+    """Auto-tags, top-n predictions and similarity signatures for (title, body)
+    pairs. Runs in a worker process.
+
+    Also returns this worker's prediction and lemma cache counters for /metrics.
+    """
+    tags, results, signatures = _tag_and_predict_with(_worker_assigner(version), reports, top_n)
+    return tags, results, signatures, (os.getpid(), prediction_cache.stats(), lemma_cache_stats())
+
+# Latest cache counters reported by each worker process, by pid
+worker_cache_stats = {}
+worker_lemma_stats = {}
+
+async def run_inference(reports, top_n: int = 5):
+    """Tag, predict and sign off the event loop with the model version live right now.
+
+    Returns (tags, predictions, signatures), one entry per report.
+    """
+    assigner = get_assigner()
+    if config.API_INFERENCE_EXECUTOR == "thread":
+        # Threads share the live assigner directly, no version lookup needed
+        return await inference_executor.run(_tag_and_predict_with, assigner, reports, top_n)
+    tags, results, signatures, (pid, stats, lemma_stats) = await inference_executor.run(
+        tag_and_predict, reports, assigner.version, top_n
+    )
+    worker_cache_stats[pid] = stats
+    worker_lemma_stats[pid] = lemma_stats
+    return tags, results, signatures
+
+def _summed_worker_stats(snapshots, **limits) -> dict:
+    hits = sum(s["hits"] for s in snapshots)
+    misses = sum(s["misses"] for s in snapshots)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "size": sum(s["size"] for s in snapshots),
+        **limits,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "workers": len(snapshots)
+    }
+
+def prediction_cache_stats() -> dict:
+    """Prediction cache counters for this process, or summed over the worker processes."""
+    if config.API_INFERENCE_EXECUTOR == "thread":
+        return prediction_cache.stats()
+    return _summed_worker_stats(
+        list(worker_cache_stats.values()), max_size=prediction_cache.max_size, ttl_seconds=prediction_cache.ttl
+    )
+
+def preprocessing_cache_stats() -> dict:
+    """Token cleanup/lemma LRU counters, for this process or summed over the worker processes."""
+    if config.API_INFERENCE_EXECUTOR == "thread":
+        return lemma_cache_stats()
+    return _summed_worker_stats(list(worker_lemma_stats.values()), max_size=config.LEMMA_CACHE_SIZE)
+
+def shutdown_executors():
+    inference_executor.shutdown()
+    db_executor.shutdown()
@@ -1,32 +1,102 @@
+from sqlalchemy import func, insert, literal, select, tuple_
 from sqlalchemy.orm import Session
 from api import models, schemas
+from src.utils.helpers import chunked, title_hash
+import base64
+import datetime
 import json
 
+# Ids per DELETE / archive statement, well below SQLite's bound-parameter limit
+DELETE_CHUNK_SIZE = 500
+
 def get_bug(db: Session, bug_id: int):
     return db.query(models.Bug).filter(models.Bug.id == bug_id).first()
 
 def get_bug_by_title(db: Session, title: str):
-    return db.query(models.Bug).filter(models.Bug.title == title).first()
+    # Indexed lookup on the normalized-title hash instead of scanning bugs.title
+    return db.query(models.Bug).filter(models.Bug.title_hash == title_hash(title)).first()
+
+def get_bug_titles(db: Session, bug_ids: list) -> dict:
+    if not bug_ids:
+        return {}
+    rows = db.query(models.Bug.id, models.Bug.title).filter(models.Bug.id.in_(bug_ids))
+    return {bug_id: title for bug_id, title in rows}
+
+def encode_cursor(created_at, bug_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{bug_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    created_at, bug_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").rsplit("|", 1)
+    return datetime.datetime.fromisoformat(created_at), int(bug_id)
+
+def get_bugs(db: Session, skip: int = 0, limit: int = 100, cursor: str = None,
+             status: str = None, tag: str = None, source: str = None):
+    """One page of bugs, newest first, plus the cursor for the next page (None at the end).
 
-from sqlalchemy.orm import Session, joinedload
+    Keyset pagination on (created_at, id): the cursor is the last row's key, so
+    a deep page is an index seek like the first one. `skip` is the old offset
+    paging, still honoured when no cursor is given.
 
-def get_bugs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Bug).options(
-        joinedload(models.Bug.assignments),
-        joinedload(models.Bug.predictions)
-    ).offset(skip).limit(limit).all()
+    Each bug carries only its latest assignment and its top prediction,
+    fetched for the page's ids in two grouped queries rather than eager
+    loading every related row.
+    """
+    query = db.query(models.Bug)
+    if status:
+        query = query.filter(models.Bug.status == status)
+    if source:
+        query = query.filter(models.Bug.source == source)
+    if tag:
+        # tags is a comma-separated list; match whole entries only
+        query = query.filter((literal(",") + models.Bug.tags + literal(",")).contains(f",{tag},", autoescape=True))
+    if cursor:
+        query = query.filter(tuple_(models.Bug.created_at, models.Bug.id) < decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    bugs = query.order_by(models.Bug.created_at.desc(), models.Bug.id.desc()).limit(limit).all()
+
+    bug_ids = [bug.id for bug in bugs]
+    latest_assignments = _latest_by_bug(db, models.BugAssignment, bug_ids)
+    latest_predictions = _latest_by_bug(db, models.ModelPrediction, bug_ids)
+    page = []
+    for bug in bugs:
+        assignment = latest_assignments.get(bug.id)
+        prediction = latest_predictions.get(bug.id)
+        page.append({
+            "id": bug.id, "title": bug.title, "body": bug.body, "priority": bug.priority,
+            "tags": bug.tags, "source": bug.source, "status": bug.status,
+            "created_at": bug.created_at, "updated_at": bug.updated_at,
+            "assignments": [assignment] if assignment else [],
+            "predictions": [prediction] if prediction else []
+        })
+
+    next_cursor = None
+    if len(bugs) == limit:
+        next_cursor = encode_cursor(bugs[-1].created_at, bugs[-1].id)
+    return page, next_cursor
+
+def _latest_by_bug(db: Session, model, bug_ids: list) -> dict:
+    """bug_id -> most recent row of `model` (highest id) for the given bugs."""
+    if not bug_ids:
+        return {}
+    latest_ids = (
+        db.query(func.max(model.id))
+        .filter(model.bug_id.in_(bug_ids))
+        .group_by(model.bug_id)
+    )
+    return {row.bug_id: row for row in db.query(model).filter(model.id.in_(latest_ids.scalar_subquery()))}
 
-def create_bug(db: Session, bug: schemas.BugCreate, tags: str = None):
+def create_bug(db: Session, bug: schemas.BugCreate, tags: str = None, commit: bool = True):
     bug_data = bug.dict()
     if tags:
         bug_data["tags"] = tags
     db_bug = models.Bug(**bug_data)
     db.add(db_bug)
-    db.commit()
-    db.refresh(db_bug)
+    _save(db, db_bug, commit)
     return db_bug
 
-def create_prediction(db: Session, bug_id: int, prediction: dict, threshold: float):
+def create_prediction(db: Session, bug_id: int, prediction: dict, threshold: float, commit: bool = True):
     db_prediction = models.ModelPrediction(
         bug_id=bug_id,
         predicted_developer=prediction["predictions"][0]["predicted_developer"],
@@ -35,11 +105,10 @@ def create_prediction(db: Session, bug_id: int, prediction: dict, threshold: flo
         threshold_used=threshold
     )
     db.add(db_prediction)
-    db.commit()
-    db.refresh(db_prediction)
+    _save(db, db_prediction, commit)
     return db_prediction
 
-def create_assignment(db: Session, bug_id: int, developer_name: str, assignment_type: str, developer_id: int = None):
+def create_assignment(db: Session, bug_id: int, developer_name: str, assignment_type: str, developer_id: int = None, bug: models.Bug = None, commit: bool = True):
     db_assignment = models.BugAssignment(
         bug_id=bug_id,
         developer_id=developer_id,
@@ -48,37 +117,70 @@ def create_assignment(db: Session, bug_id: int, developer_name: str, assignment_
     )
     db.add(db_assignment)
     
-    # Update bug status
-    bug = db.query(models.Bug).filter(models.Bug.id == bug_id).first()
+    # Update bug status (identity map lookup, no query if the bug is already loaded)
+    if bug is None:
+        bug = db.get(models.Bug, bug_id)
     if assignment_type == 'auto':
         bug.status = 'assigned'
     else:
         bug.status = 'manual-review'
     
-    db.commit()
-    db.refresh(db_assignment)
+    _save(db, db_assignment, commit)
     return db_assignment
 
+def create_triaged_bug(db: Session, bug: schemas.BugCreate, tags: str, prediction: dict, threshold: float,
+                       developer_name: str, assignment_type: str, signature: bytes = None):
+    """Write a bug, its prediction and its assignment as one unit of work.
+
+    flush() hands out the bug id without ending the transaction, so the three
+    rows cost a single commit (one fsync on SQLite) and roll back together.
+    """
+    try:
+        db_bug = create_bug(db, bug, tags=tags, commit=False)
+        create_prediction(db, db_bug.id, prediction, threshold, commit=False)
+        create_assignment(db, db_bug.id, developer_name, assignment_type, bug=db_bug, commit=False)
+        if signature is not None:
+            db.add(models.BugSignature(bug_id=db_bug.id, signature=signature))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return db_bug
+
+def _save(db: Session, obj, commit: bool):
+    # Commit + refresh for standalone writes, flush only inside a larger unit of work
+    if commit:
+        db.commit()
+        db.refresh(obj)
+    else:
+        db.flush()
+
 def get_dashboard_stats(db: Session):
-    total = db.query(models.Bug).count()
-    auto = db.query(models.Bug).filter(models.Bug.status == 'assigned').count()
-    manual = db.query(models.Bug).filter(models.Bug.status == 'manual-review').count()
-    pending = db.query(models.Bug).filter(models.Bug.status == 'open').count()
-    
-    # Bugs per developer - only for currently existing bugs
-    dev_counts = {}
-    # Join with assignments to get the latest developer name for each assigned bug
-    active_assignments = db.query(models.BugAssignment).join(models.Bug).all()
-    for a in active_assignments:
-        dev = a.developer_name
-        dev_counts[dev] = dev_counts.get(dev, 0) + 1
+    # Bug counts per status in one grouped pass (index-only scan of ix_bugs_status)
+    by_status = dict(db.query(models.Bug.status, func.count()).group_by(models.Bug.status).all())
+
+    # Bugs per developer - only for currently existing bugs, counting each
+    # bug once under its latest assignment (highest assignment id)
+    latest = (
+        db.query(func.max(models.BugAssignment.id).label("id"))
+        .group_by(models.BugAssignment.bug_id)
+        .subquery()
+    )
+    dev_counts = dict(
+        db.query(models.BugAssignment.developer_name, func.count())
+        .join(latest, models.BugAssignment.id == latest.c.id)
+        .join(models.Bug, models.Bug.id == models.BugAssignment.bug_id)
+        .filter(models.BugAssignment.developer_name != None)
+        .group_by(models.BugAssignment.developer_name)
+        .all()
+    )
         
     return {
-        "total_bugs": total,
-        "auto_assigned": auto,
-        "manual_review": manual,
+        "total_bugs": sum(by_status.values()),
+        "auto_assigned": by_status.get('assigned', 0),
+        "manual_review": by_status.get('manual-review', 0),
         "bugs_per_developer": dev_counts,
-        "pending_bugs": pending
+        "pending_bugs": by_status.get('open', 0)
     }
 
 def get_users(db: Session, role: str = None):
@@ -91,22 +193,49 @@ def get_prediction_by_bug(db: Session, bug_id: int):
     return db.query(models.ModelPrediction).filter(models.ModelPrediction.bug_id == bug_id).first()
 
 def delete_bug(db: Session, bug_id: int):
-    # Manually delete related records to be safe
-    db.query(models.BugAssignment).filter(models.BugAssignment.bug_id == bug_id).delete(synchronize_session=False)
-    db.query(models.ModelPrediction).filter(models.ModelPrediction.bug_id == bug_id).delete(synchronize_session=False)
-    
-    db_bug = db.query(models.Bug).filter(models.Bug.id == bug_id).first()
-    if db_bug:
-        db.delete(db_bug)
-        db.commit()
-        return True
-    return False
+    # One statement; ON DELETE CASCADE removes the bug's dependent rows
+    count = db.query(models.Bug).filter(models.Bug.id == bug_id).delete(synchronize_session=False)
+    db.commit()
+    return count > 0
 
 def delete_bugs(db: Session, bug_ids: list):
-    # Manually delete related records first because bulk delete doesn't trigger cascade
-    db.query(models.BugAssignment).filter(models.BugAssignment.bug_id.in_(bug_ids)).delete(synchronize_session=False)
-    db.query(models.ModelPrediction).filter(models.ModelPrediction.bug_id.in_(bug_ids)).delete(synchronize_session=False)
-    
-    count = db.query(models.Bug).filter(models.Bug.id.in_(bug_ids)).delete(synchronize_session=False)
+    # Chunked set-based deletes in one transaction, children via ON DELETE CASCADE
+    count = 0
+    for batch in chunked(set(bug_ids), DELETE_CHUNK_SIZE):
+        count += db.query(models.Bug).filter(models.Bug.id.in_(batch)).delete(synchronize_session=False)
     db.commit()
     return count
+
+ARCHIVED_BUG_COLUMNS = ["title", "title_hash", "body", "priority", "tags", "source", "status",
+                        "reporter_id", "created_at", "updated_at"]
+
+def archive_bugs(db: Session, bug_ids: list):
+    """Move bugs into bugs_archive and delete them from the hot tables.
+
+    Copies each bug with its latest assignee and GitHub id, INSERT ... SELECT
+    per chunk, all in one transaction.
+    """
+    latest_developer = (
+        select(models.BugAssignment.developer_name)
+        .where(models.BugAssignment.bug_id == models.Bug.id)
+        .order_by(models.BugAssignment.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    github_id = select(models.GithubIssue.github_id).where(models.GithubIssue.bug_id == models.Bug.id).scalar_subquery()
+    rows = select(models.Bug.id, *[getattr(models.Bug, c) for c in ARCHIVED_BUG_COLUMNS], latest_developer, github_id)
+
+    count = 0
+    for batch in chunked(set(bug_ids), DELETE_CHUNK_SIZE):
+        db.execute(insert(models.ArchivedBug).from_select(
+            ["bug_id", *ARCHIVED_BUG_COLUMNS, "assigned_developer", "github_id"],
+            rows.where(models.Bug.id.in_(batch))
+        ))
+        count += db.query(models.Bug).filter(models.Bug.id.in_(batch)).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+def stale_closed_bug_ids(db: Session, older_than_days: int) -> list:
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=older_than_days)
+    rows = db.query(models.Bug.id).filter(models.Bug.status == "closed", models.Bug.updated_at < cutoff)
+    return [bug_id for (bug_id,) in rows]
@@ -0,0 +1,87 @@
+import functools
+from sqlalchemy.ext.asyncio import AsyncSession
+from api import crud
+from api.concurrency import db_executor
+from database.db_connection import SessionLocal, get_async_session_factory
+
+class AsyncDB:
+    """A request's database session, driven without blocking the event loop.
+
+    With an async driver (aiosqlite, asyncpg) the session is an AsyncSession
+    and `run` goes through run_sync: the sync CRUD code runs unchanged while
+    every round trip awaits the driver. Without one, the session is a plain
+    Session and `run` hands the call to the bounded DB thread pool.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def is_async(self) -> bool:
+        return isinstance(self.session, AsyncSession)
+
+    async def run(self, fn, *args, **kwargs):
+        """Call fn(sync_session, *args, **kwargs)."""
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await db_executor.run(functools.partial(fn, self.session, *args, **kwargs))
+
+async def get_async_db():
+    factory = get_async_session_factory()
+    if factory is not None:
+        async with factory() as session:
+            yield AsyncDB(session)
+        return
+    db = SessionLocal()
+    try:
+        yield AsyncDB(db)
+    finally:
+        db.close()
+
+# Async equivalents of api.crud, same arguments minus the session
+
+async def get_bug(db: AsyncDB, bug_id: int):
+    return await db.run(crud.get_bug, bug_id)
+
+async def get_bug_by_title(db: AsyncDB, title: str):
+    return await db.run(crud.get_bug_by_title, title)
+
+async def get_bug_titles(db: AsyncDB, bug_ids: list) -> dict:
+    return await db.run(crud.get_bug_titles, bug_ids)
+
+async def get_bugs(db: AsyncDB, **filters):
+    return await db.run(crud.get_bugs, **filters)
+
+async def create_bug(db: AsyncDB, bug, tags: str = None):
+    return await db.run(crud.create_bug, bug, tags)
+
+async def create_prediction(db: AsyncDB, bug_id: int, prediction: dict, threshold: float):
+    return await db.run(crud.create_prediction, bug_id, prediction, threshold)
+
+async def create_assignment(db: AsyncDB, bug_id: int, developer_name: str, assignment_type: str, developer_id: int = None):
+    return await db.run(crud.create_assignment, bug_id, developer_name, assignment_type, developer_id)
+
+async def create_triaged_bug(db: AsyncDB, bug, tags: str, prediction: dict, threshold: float,
+                             developer_name: str, assignment_type: str, signature: bytes = None):
+    return await db.run(crud.create_triaged_bug, bug, tags, prediction, threshold, developer_name, assignment_type, signature)
+
+async def get_dashboard_stats(db: AsyncDB):
+    return await db.run(crud.get_dashboard_stats)
+
+async def get_users(db: AsyncDB, role: str = None):
+    return await db.run(crud.get_users, role)
+
+async def get_prediction_by_bug(db: AsyncDB, bug_id: int):
+    return await db.run(crud.get_prediction_by_bug, bug_id)
+
+async def delete_bug(db: AsyncDB, bug_id: int):
+    return await db.run(crud.delete_bug, bug_id)
+
+async def delete_bugs(db: AsyncDB, bug_ids: list):
+    return await db.run(crud.delete_bugs, bug_ids)
+
+async def archive_bugs(db: AsyncDB, bug_ids: list):
+    return await db.run(crud.archive_bugs, bug_ids)
+
+async def stale_closed_bug_ids(db: AsyncDB, older_than_days: int) -> list:
+    return await db.run(crud.stale_closed_bug_ids, older_than_days)
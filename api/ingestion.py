@@ -0,0 +1,256 @@
+import json
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from api import crud, models, schemas
+from api.concurrency import run_inference
+from api.similarity import bug_signature, signature_bytes, similarity_index
+from src.config import config
+from src.prediction.assign_developer import get_assigner
+from src.preprocessing.nlp_preprocessor import generate_tags
+from src.utils.developer_matcher import DeveloperMatcher
+from src.utils.helpers import chunked, title_hash
+from src.utils.minhash_lsh import LSHIndex
+
+ASSIGNMENT_THRESHOLD = 0.40
+# Stay well below SQLite's bound-parameter limit in IN (...) lookups
+LOOKUP_CHUNK_SIZE = 500
+
+def build_matcher(db: Session) -> DeveloperMatcher:
+    developers = crud.get_users(db, role="developer")
+    return DeveloperMatcher([
+        {"id": d.id, "username": d.username, "full_name": d.full_name, "email": f"{d.username}@internal.com"}
+        for d in developers
+    ])
+
+def triage_decision(results: list, auto_tags: str, override_developer: str = None):
+    """Apply the auto-assignment threshold to a prediction.
+
+    Returns (prediction payload, developer to assign, "auto" | "manual").
+    """
+    if override_developer:
+        # If we matched an existing developer (e.g. from GitHub), force auto-assignment
+        is_auto_assigned = True
+        top_developer = override_developer
+    else:
+        top_prediction = results[0]
+        is_auto_assigned = top_prediction["confidence"] >= ASSIGNMENT_THRESHOLD
+        top_developer = top_prediction["predicted_developer"]
+
+    payload = {
+        "predictions": results,
+        "threshold": ASSIGNMENT_THRESHOLD,
+        "is_auto_assigned": is_auto_assigned,
+        "tags": auto_tags,
+        "matched_from_source": override_developer is not None
+    }
+    return payload, top_developer, "auto" if is_auto_assigned else "manual"
+
+def existing_title_hashes(db: Session, hashes) -> set:
+    """Normalized-title hashes already in the bugs table or its archive (index lookups, no scan)."""
+    found = set()
+    for batch in chunked(set(hashes), LOOKUP_CHUNK_SIZE):
+        for model in (models.Bug, models.ArchivedBug):
+            rows = db.query(model.title_hash).filter(model.title_hash.in_(batch))
+            found.update(h for (h,) in rows)
+    return found
+
+def existing_github_ids(db: Session, github_ids) -> set:
+    """GitHub issue ids already linked to a bug through github_issues, or archived."""
+    found = set()
+    for batch in chunked(set(github_ids), LOOKUP_CHUNK_SIZE):
+        for column in (models.GithubIssue.github_id, models.ArchivedBug.github_id):
+            rows = db.query(column).filter(column.in_(batch))
+            found.update(g for (g,) in rows)
+    return found
+
+def github_ref(issue: dict):
+    """GitHub identity of a collected issue, or None for issues from other sources."""
+    if issue.get("issue_id") is None or not issue.get("repository"):
+        return None
+    return {"github_id": issue["issue_id"], "issue_number": issue["issue_number"], "repo_full_name": issue["repository"]}
+
+def plan_ingestion(db: Session, issues, source: str, matcher: DeveloperMatcher = None):
+    """Drop duplicates (against the DB and within the batch) and match assignees.
+
+    `issues` are dicts with title, body and optionally assignee, plus
+    issue_id/issue_number/repository when collected from GitHub. An issue is
+    a duplicate if its GitHub id is already linked or its normalized title
+    is already present.
+    Returns (reports, override developers, GitHub refs, skipped titles).
+    """
+    hashes = [title_hash(issue["title"]) for issue in issues]
+    refs = [github_ref(issue) for issue in issues]
+    seen_hashes = existing_title_hashes(db, hashes)
+    seen_ids = existing_github_ids(db, [ref["github_id"] for ref in refs if ref])
+
+    reports, overrides, github_refs, skipped = [], [], [], []
+    for issue, h, ref in zip(issues, hashes, refs):
+        if h in seen_hashes or (ref and ref["github_id"] in seen_ids):
+            skipped.append(issue["title"])
+            continue
+        seen_hashes.add(h)
+        if ref:
+            seen_ids.add(ref["github_id"])
+
+        override_dev = None
+        assignee = issue.get("assignee")
+        if matcher and assignee and assignee != "unassigned":
+            match_res = matcher.match(assignee)
+            if match_res["developer_found"]:
+                override_dev = match_res["matched_developer_name"]
+
+        reports.append(schemas.BugCreate(
+            title=issue["title"],
+            body=issue.get("body") or "",
+            priority="medium",
+            source=source
+        ))
+        overrides.append(override_dev)
+        github_refs.append(ref)
+    return reports, overrides, github_refs, skipped
+
+def near_duplicate_flags(db: Session, signatures, threshold: float):
+    """For each signature: is it at least `threshold` similar to a stored bug,
+    or to an earlier report of the same batch?"""
+    similarity_index.refresh(db)
+    batch_index = LSHIndex(config.MINHASH_NUM_PERM, config.LSH_BANDS)
+    flags = []
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            flags.append(False)
+            continue
+        is_duplicate = bool(
+            similarity_index.lsh.query(sig, threshold=threshold, limit=1)
+            or batch_index.query(sig, threshold=threshold, limit=1)
+        )
+        if not is_duplicate:
+            batch_index.add(i, sig)
+        flags.append(is_duplicate)
+    return flags
+
+def drop_near_duplicates(db: Session, batch: dict, skipped: list) -> dict:
+    """Remove near-duplicate reports from `batch` (parallel per-report lists) into `skipped`.
+
+    Only active when INGEST_NEAR_DUPLICATE_THRESHOLD > 0.
+    """
+    threshold = config.INGEST_NEAR_DUPLICATE_THRESHOLD
+    if threshold <= 0 or not batch["reports"]:
+        return batch
+    flags = near_duplicate_flags(db, batch["signatures"], threshold)
+    skipped.extend(report.title for report, is_duplicate in zip(batch["reports"], flags) if is_duplicate)
+    return {
+        name: [value for value, is_duplicate in zip(values, flags) if not is_duplicate]
+        for name, values in batch.items()
+    }
+
+def bulk_insert(db: Session, reports, tags, results, overrides, github_refs=None, signatures=None):
+    """Insert bugs, predictions and assignments for a whole batch in one transaction.
+
+    Bugs go in with a single executemany INSERT ... RETURNING id, then the
+    prediction, assignment, github_issues and bug_signatures rows with one
+    executemany each. Returns (imported, errors) in the shape the import
+    endpoints respond with.
+    """
+    if len(results) != len(reports):
+        results = [[] for _ in reports]
+
+    bug_rows, decisions = [], []
+    for report, auto_tags, report_results, override_dev in zip(reports, tags, results, overrides):
+        row = report.dict()
+        if auto_tags:
+            row["tags"] = auto_tags
+        decision = triage_decision(report_results, auto_tags, override_dev) if report_results else None
+        if decision:
+            row["status"] = "assigned" if decision[2] == "auto" else "manual-review"
+        bug_rows.append(row)
+        decisions.append(decision)
+
+    imported, errors = [], []
+    if not bug_rows:
+        return imported, errors
+    try:
+        bug_ids = db.scalars(
+            insert(models.Bug).returning(models.Bug.id, sort_by_parameter_order=True), bug_rows
+        ).all()
+
+        github_rows = [
+            {"bug_id": bug_id, **ref}
+            for bug_id, ref in zip(bug_ids, github_refs or [])
+            if ref
+        ]
+        if github_rows:
+            db.execute(insert(models.GithubIssue), github_rows)
+
+        signed = [(bug_id, sig) for bug_id, sig in zip(bug_ids, signatures or []) if sig is not None]
+        if signed:
+            db.execute(insert(models.BugSignature), [
+                {"bug_id": bug_id, "signature": signature_bytes(sig)} for bug_id, sig in signed
+            ])
+
+        prediction_rows, assignment_rows = [], []
+        for bug_id, report, decision in zip(bug_ids, reports, decisions):
+            if decision is None:
+                # Keep the report even without a prediction, as the single-bug path does
+                errors.append({"title": report.title, "error": "Model not loaded or prediction failed"})
+                continue
+            payload, developer, assignment_type = decision
+            prediction_rows.append({
+                "bug_id": bug_id,
+                "predicted_developer": payload["predictions"][0]["predicted_developer"],
+                "confidence": payload["predictions"][0]["confidence"],
+                "top_alternatives": json.dumps(payload["predictions"]),
+                "threshold_used": ASSIGNMENT_THRESHOLD
+            })
+            assignment_rows.append({
+                "bug_id": bug_id,
+                "developer_name": developer,
+                "assignment_type": assignment_type
+            })
+            imported.append({
+                "bug_id": bug_id,
+                "predictions": payload["predictions"],
+                "threshold": ASSIGNMENT_THRESHOLD,
+                "is_auto_assigned": payload["is_auto_assigned"],
+                "title": report.title
+            })
+
+        if prediction_rows:
+            db.execute(insert(models.ModelPrediction), prediction_rows)
+            db.execute(insert(models.BugAssignment), assignment_rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    similarity_index.add_many(signed)
+    return imported, errors
+
+def _batch(reports, overrides, github_refs, tags, results, signatures) -> dict:
+    if len(results) != len(reports):
+        # Model not loaded / prediction failed for the whole batch
+        results = [[] for _ in reports]
+    return {"reports": reports, "tags": tags, "results": results, "overrides": overrides,
+            "github_refs": github_refs, "signatures": signatures}
+
+def ingest_issues(db: Session, issues, source: str, matcher: DeveloperMatcher = None) -> dict:
+    """Synchronous pipeline for scripts and backfills: dedupe, batch tag + predict + sign,
+    optional near-duplicate dedupe, bulk insert."""
+    reports, overrides, github_refs, skipped = plan_ingestion(db, issues, source, matcher)
+    pairs = [(r.title, r.body) for r in reports]
+    tags = [generate_tags(f"{title} {body}") for title, body in pairs]
+    results, clean_texts = get_assigner().predict_many_with_text(pairs)
+    signatures = [bug_signature(title, body, clean) for (title, body), clean in zip(pairs, clean_texts)]
+    batch = drop_near_duplicates(db, _batch(reports, overrides, github_refs, tags, results, signatures), skipped)
+    imported, errors = bulk_insert(db, **batch)
+    return {"imported": imported, "skipped_titles": skipped, "errors": errors}
+
+async def ingest_issues_async(db, issues, source: str, matcher: DeveloperMatcher = None) -> dict:
+    """Same pipeline for the API: DB work through the request's AsyncDB, tagging +
+    inference on the inference pool."""
+    reports, overrides, github_refs, skipped = await db.run(plan_ingestion, issues, source, matcher)
+    tags, results, signatures = [], [], []
+    if reports:
+        tags, results, signatures = await run_inference([(r.title, r.body) for r in reports])
+    batch = _batch(reports, overrides, github_refs, tags, results, signatures)
+    batch = await db.run(drop_near_duplicates, batch, skipped)
+    imported, errors = await db.run(bulk_insert, **batch)
+    return {"imported": imported, "skipped_titles": skipped, "errors": errors}
@@ -1,37 +1,59 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Boolean, Enum, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from database.db_connection import Base
+from src.utils.helpers import title_hash
 import datetime
 
+def _title_hash_default(context):
+    # Filled in for ORM adds and bulk executemany inserts alike
+    return title_hash(context.get_current_parameters()["title"])
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     full_name = Column(String)
-    role = Column(String, default="reporter") # admin, developer, reporter
+    role = Column(String, default="reporter", index=True) # admin, developer, reporter
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
 class Bug(Base):
     __tablename__ = "bugs"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
+    # Hash of the normalized title for indexed duplicate checks. Not unique:
+    # /predict still accepts a bug re-filed under the same title.
+    title_hash = Column(String(16), index=True, default=_title_hash_default)
     body = Column(Text, nullable=False)
     priority = Column(String, default="medium")
     tags = Column(String)
     source = Column(String, default="manual")
-    status = Column(String, default="open")
+    status = Column(String, default="open", index=True)
     reporter_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Part of the keyset cursor of GET /bugs, so never NULL
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
-    predictions = relationship("ModelPrediction", back_populates="bug", cascade="all, delete-orphan")
-    assignments = relationship("BugAssignment", back_populates="bug", cascade="all, delete-orphan")
+    # Child rows go with the bug through ON DELETE CASCADE; the ORM doesn't load them to delete them
+    predictions = relationship("ModelPrediction", back_populates="bug", cascade="all, delete-orphan", passive_deletes=True)
+    assignments = relationship("BugAssignment", back_populates="bug", cascade="all, delete-orphan", passive_deletes=True)
+    github_issue = relationship("GithubIssue", back_populates="bug", uselist=False, cascade="all, delete-orphan",
+                                passive_deletes=True)
+
+    # Keyset pagination of the bug list on (created_at, id), unfiltered and
+    # filtered by status or source
+    __table_args__ = (
+        Index("ix_bugs_created_at_id", "created_at", "id"),
+        Index("ix_bugs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_bugs_source_created_at_id", "source", "created_at", "id"),
+        # Ids are never reused after a delete or archive (see _autoincrement_bug_ids)
+        {"sqlite_autoincrement": True},
+    )
 
 class ModelPrediction(Base):
     __tablename__ = "model_predictions"
     id = Column(Integer, primary_key=True, index=True)
-    bug_id = Column(Integer, ForeignKey("bugs.id"))
+    bug_id = Column(Integer, ForeignKey("bugs.id", ondelete="CASCADE"))
     predicted_developer = Column(String, nullable=False)
     confidence = Column(Float, nullable=False)
     top_alternatives = Column(Text) # JSON string
@@ -40,10 +62,12 @@ class ModelPrediction(Base):
 
     bug = relationship("Bug", back_populates="predictions")
 
+    __table_args__ = (Index("ix_model_predictions_bug_id_id", "bug_id", "id"),)
+
 class BugAssignment(Base):
     __tablename__ = "bug_assignments"
     id = Column(Integer, primary_key=True, index=True)
-    bug_id = Column(Integer, ForeignKey("bugs.id"))
+    bug_id = Column(Integer, ForeignKey("bugs.id", ondelete="CASCADE"))
     developer_id = Column(Integer, ForeignKey("users.id"))
     developer_name = Column(String)
     assigned_by_id = Column(Integer, ForeignKey("users.id"))
@@ -51,3 +75,45 @@ class BugAssignment(Base):
     assigned_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     bug = relationship("Bug", back_populates="assignments")
+
+    # Covers "latest assignment per bug" (MAX(id) grouped by bug_id) without touching the table
+    __table_args__ = (Index("ix_bug_assignments_bug_id_id", "bug_id", "id"),)
+
+class GithubIssue(Base):
+    __tablename__ = "github_issues"
+    id = Column(Integer, primary_key=True, index=True)
+    bug_id = Column(Integer, ForeignKey("bugs.id", ondelete="CASCADE"), unique=True, nullable=False)
+    github_id = Column(Integer, unique=True, nullable=False) # GitHub's global issue id
+    issue_number = Column(Integer, nullable=False)
+    repo_full_name = Column(String, nullable=False)
+    last_synced_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    bug = relationship("Bug", back_populates="github_issue")
+
+class BugSignature(Base):
+    __tablename__ = "bug_signatures"
+    bug_id = Column(Integer, ForeignKey("bugs.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False) # MinHash of the preprocessed text, uint32 array bytes
+
+class ArchivedBug(Base):
+    """Cold copy of a bug moved out of the hot bugs table (see crud.archive_bugs).
+
+    Keeps the bug's own columns plus its final assignee and GitHub id; the
+    predictions and assignment history are dropped with the bug.
+    """
+    __tablename__ = "bugs_archive"
+    id = Column(Integer, primary_key=True)
+    bug_id = Column(Integer, index=True) # the bug's id while it was live
+    title = Column(String, nullable=False)
+    title_hash = Column(String(16), index=True)
+    body = Column(Text, nullable=False)
+    priority = Column(String)
+    tags = Column(String)
+    source = Column(String)
+    status = Column(String)
+    reporter_id = Column(Integer)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    assigned_developer = Column(String)
+    github_id = Column(Integer, index=True) # keeps re-fetches of archived issues deduplicated
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow)
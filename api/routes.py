@@ -1,158 +1,155 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from api import schemas, crud
-from database.db_connection import get_db
-from src.prediction.assign_developer import assigner
-from src.preprocessing.nlp_preprocessor import generate_tags
+from api.batching import predict_batcher
+from api.concurrency import db_executor, inference_executor, prediction_cache_stats, preprocessing_cache_stats, run_inference
+from api.ingestion import ASSIGNMENT_THRESHOLD, build_matcher, bulk_insert, ingest_issues_async, triage_decision
+from api.similarity import signature_bytes, similarity_index
+from src.config import config
+from api import crud_async
+from api.crud_async import AsyncDB, get_async_db
+from src.prediction import assign_developer
+from src.prediction.assign_developer import get_assigner
+from src.prediction.model_registry import registry
 from typing import List
 import json
 import os
 import random
 
 from src.data_collection.github_collector import fetch_bugs_from_github
-from src.utils.developer_matcher import DeveloperMatcher
 
 router = APIRouter()
 
-async def process_bug_report(report: schemas.BugCreate, db: Session, override_developer: str = None):
-    """Helper to process a bug report: tag, save, predict, assign."""
-    ASSIGNMENT_THRESHOLD = 0.40
-    
-    # 1. Generate auto-tags
-    auto_tags = generate_tags(f"{report.title} {report.body}")
+def require_model():
+    """Reject prediction requests with a 503 until the model has finished loading."""
+    assigner = get_assigner()
+    if assigner.is_ready:
+        return
+    if assigner.status == "failed":
+        raise HTTPException(status_code=503, detail=f"Model failed to load: {assigner.error}")
+    raise HTTPException(status_code=503, detail="Model is still loading, retry shortly", headers={"Retry-After": "5"})
 
-    # 2. Persist Bug with tags
-    db_bug = crud.create_bug(db, report, tags=auto_tags)
-    
-    # 3. Get Prediction
-    results = assigner.predict(report.title, report.body)
+def save_bug_report(db: Session, report: schemas.BugCreate, auto_tags: str, results: list, override_developer: str = None, signature=None):
+    """Persist a tagged bug with its prediction and assignment (blocking, runs on the DB pool)."""
     if not results:
+        # Keep the report even without a prediction, as before
+        crud.create_bug(db, report, tags=auto_tags)
         return None, "Model not loaded or prediction failed"
     
-    # 4. Decision Logic
-    if override_developer:
-        # If we matched an existing developer (e.g. from GitHub), force auto-assignment
-        is_auto_assigned = True
-        top_developer = override_developer
-        confidence = 1.0 # Manual match is highest confidence
-    else:
-        top_prediction = results[0]
-        is_auto_assigned = top_prediction["confidence"] >= ASSIGNMENT_THRESHOLD
-        top_developer = top_prediction["predicted_developer"]
-        confidence = top_prediction["confidence"]
-    
-    # 5. Save Prediction Result
-    res_payload = {
-        "predictions": results,
-        "threshold": ASSIGNMENT_THRESHOLD,
-        "is_auto_assigned": is_auto_assigned,
-        "tags": auto_tags,
-        "matched_from_source": override_developer is not None
-    }
-    crud.create_prediction(db, db_bug.id, res_payload, ASSIGNMENT_THRESHOLD)
+    # 2. Decision Logic
+    res_payload, top_developer, assignment_type = triage_decision(results, auto_tags, override_developer)
     
-    # 6. Handle Assignment
-    if is_auto_assigned:
-        crud.create_assignment(db, db_bug.id, top_developer, "auto")
-    else:
-        crud.create_assignment(db, db_bug.id, top_developer, "manual")
+    # 3. Persist Bug with tags, prediction and assignment in a single transaction
+    db_bug = crud.create_triaged_bug(db, report, auto_tags, res_payload, ASSIGNMENT_THRESHOLD, top_developer, assignment_type,
+                                     signature=signature_bytes(signature))
+    similarity_index.add_many([(db_bug.id, signature)])
         
     return {
         "bug_id": db_bug.id,
         "predictions": results,
         "threshold": ASSIGNMENT_THRESHOLD,
-        "is_auto_assigned": is_auto_assigned,
+        "is_auto_assigned": res_payload["is_auto_assigned"],
         "title": report.title
     }, None
 
+async def process_bug_report(report: schemas.BugCreate, db: AsyncDB, override_developer: str = None, results: list = None, auto_tags: str = None, signature=None):
+    """Helper to process a bug report: tag, save, predict, assign.
+
+    Tagging and inference run on the inference pool and the database writes
+    through the request's AsyncDB, so the event loop stays free for other requests.
+    `results`/`auto_tags`/`signature` may carry values already computed in a batch.
+    """
+    # 1. Generate auto-tags and get prediction (unless computed as part of a batch)
+    if results is None or auto_tags is None:
+        if config.API_MICRO_BATCHING:
+            # Coalesced with other concurrent requests into one model call
+            tags, report_results, signature = await predict_batcher.submit(report.title, report.body)
+        else:
+            batch_tags, batch_results, signatures = await run_inference([(report.title, report.body)])
+            tags, report_results, signature = batch_tags[0], (batch_results[0] if batch_results else []), signatures[0]
+        auto_tags = tags if auto_tags is None else auto_tags
+        if results is None:
+            results = report_results
+
+    return await db.run(save_bug_report, report, auto_tags, results, override_developer, signature)
+
 @router.post("/predict", response_model=schemas.PredictionResponse)
-async def predict_assignee(report: schemas.BugCreate, db: Session = Depends(get_db)):
+async def predict_assignee(report: schemas.BugCreate, db: AsyncDB = Depends(get_async_db)):
+    require_model()
     try:
         result, error = await process_bug_report(report, db)
         if error:
             raise HTTPException(status_code=500, detail=error)
         return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/batch", response_model=schemas.BatchPredictionResponse)
+async def predict_assignees_batch(req: schemas.BatchPredictRequest, db: AsyncDB = Depends(get_async_db)):
+    require_model()
+    try:
+        # One vectorizer/model call for the whole batch
+        batch_tags, batch_results, signatures = await run_inference([(r.title, r.body) for r in req.bugs])
+        if not batch_results:
+            raise HTTPException(status_code=500, detail="Model not loaded or prediction failed")
+
+        # ...and one transaction for all the bug, prediction and assignment rows
+        processed, errors = await db.run(bulk_insert, req.bugs, batch_tags, batch_results,
+                                         overrides=[None] * len(req.bugs), signatures=signatures)
+
+        return {
+            "total": len(req.bugs),
+            "processed_count": len(processed),
+            "error_count": len(errors),
+            "results": processed,
+            "errors": errors
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/fetch-github")
-async def fetch_github_issues(req: schemas.GithubFetchRequest, db: Session = Depends(get_db)):
+async def fetch_github_issues(req: schemas.GithubFetchRequest, db: AsyncDB = Depends(get_async_db)):
+    require_model()
     try:
         # 0. Initialize Matcher
-        developers = crud.get_users(db, role="developer")
-        dev_list = []
-        for d in developers:
-            dev_list.append({
-                "id": d.id,
-                "username": d.username,
-                "full_name": d.full_name,
-                "email": f"{d.username}@internal.com" # Placeholder for email check
-            })
-        matcher = DeveloperMatcher(dev_list)
+        matcher = await db.run(build_matcher)
 
         # 1. Fetch from GitHub
         raw_issues = fetch_bugs_from_github(total_limit=req.count, state="open")
         
-        imported = []
-        skipped = []
-        errors = []
-        
-        for issue in raw_issues:
-            # 2. Check for duplicates by title
-            existing = crud.get_bug_by_title(db, issue["title"])
-            if existing:
-                skipped.append(issue["title"])
-                continue
-            
-            # 3. Try to match GitHub assignee to local developer
-            override_dev = None
-            if issue.get("assignee") and issue["assignee"] != "unassigned":
-                match_res = matcher.match(issue["assignee"])
-                if match_res["developer_found"]:
-                    override_dev = match_res["matched_developer_name"]
-            
-            # 4. Process new bug
-            report = schemas.BugCreate(
-                title=issue["title"],
-                body=issue["body"],
-                priority="medium",
-                source="github"
-            )
-            
-            result, error = await process_bug_report(report, db, override_developer=override_dev)
-            if error:
-                errors.append({"title": issue["title"], "error": error})
-            else:
-                imported.append(result)
+        # 2. Dedupe, tag + predict as one batch, bulk insert in one transaction
+        outcome = await ingest_issues_async(db, raw_issues, "github", matcher)
                 
         return {
             "total_fetched": len(raw_issues),
-            "imported_count": len(imported),
-            "skipped_count": len(skipped),
-            "error_count": len(errors),
-            "imported": imported,
-            "skipped_titles": skipped,
-            "errors": errors
+            "imported_count": len(outcome["imported"]),
+            "skipped_count": len(outcome["skipped_titles"]),
+            "error_count": len(outcome["errors"]),
+            **outcome
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/import-local")
-async def import_local_bugs(req: schemas.LocalImportRequest, db: Session = Depends(get_db)):
+async def import_local_bugs(req: schemas.LocalImportRequest, db: AsyncDB = Depends(get_async_db)):
+    require_model()
     try:
         # 0. Initialize Matcher
-        developers = crud.get_users(db, role="developer")
-        dev_list = []
-        for d in developers:
-            dev_list.append({
-                "id": d.id, "username": d.username, "full_name": d.full_name, "email": f"{d.username}@internal.com"
-            })
-        matcher = DeveloperMatcher(dev_list)
+        matcher = await db.run(build_matcher)
 
         # Resolve path relative to project root
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -168,47 +165,18 @@ async def import_local_bugs(req: schemas.LocalImportRequest, db: Session = Depen
         count = min(len(all_bugs), req.count)
         sampled = random.sample(all_bugs, count)
         
-        imported = []
-        skipped = []
-        errors = []
-        
-        for bug in sampled:
-            # 1. Check for duplicates
-            existing = crud.get_bug_by_title(db, bug["title"])
-            if existing:
-                skipped.append(bug["title"])
-                continue
-            
-            # 2. Match Assignee
-            override_dev = None
-            if bug.get("assignee"):
-                match_res = matcher.match(bug["assignee"])
-                if match_res["developer_found"]:
-                    override_dev = match_res["matched_developer_name"]
-
-            # 3. Process
-            report = schemas.BugCreate(
-                title=bug["title"],
-                body=bug.get("body", ""),
-                priority="medium",
-                source="local"
-            )
-            
-            result, error = await process_bug_report(report, db, override_developer=override_dev)
-            if error:
-                errors.append({"title": bug["title"], "error": error})
-            else:
-                imported.append(result)
+        # 1. Dedupe, tag + predict as one batch, bulk insert in one transaction
+        outcome = await ingest_issues_async(db, sampled, "local", matcher)
                 
         return {
             "total_sampled": len(sampled),
-            "imported_count": len(imported),
-            "skipped_count": len(skipped),
-            "error_count": len(errors),
-            "imported": imported,
-            "skipped_titles": skipped,
-            "errors": errors
+            "imported_count": len(outcome["imported"]),
+            "skipped_count": len(outcome["skipped_titles"]),
+            "error_count": len(outcome["errors"]),
+            **outcome
         }
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -216,21 +184,30 @@ async def import_local_bugs(req: schemas.LocalImportRequest, db: Session = Depen
 
 
 @router.get("/bugs", response_model=List[schemas.BugResponse])
-async def read_bugs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    bugs = crud.get_bugs(db, skip=skip, limit=limit)
+async def read_bugs(response: Response, skip: int = 0, limit: int = Query(100, ge=1, le=1000), cursor: str = None,
+                    status: str = None, tag: str = None, source: str = None, db: AsyncDB = Depends(get_async_db)):
+    """Newest bugs first. Pass the X-Next-Cursor header of a page as `cursor` to get the next one."""
+    try:
+        bugs, next_cursor = await crud_async.get_bugs(
+            db, skip=skip, limit=limit, cursor=cursor, status=status, tag=tag, source=source
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return bugs
 
 @router.get("/stats", response_model=schemas.DashboardStats)
-async def read_stats(db: Session = Depends(get_db)):
-    return crud.get_dashboard_stats(db)
+async def read_stats(db: AsyncDB = Depends(get_async_db)):
+    return await crud_async.get_dashboard_stats(db)
 
 @router.get("/users", response_model=List[schemas.UserBase])
-async def read_users(role: str = None, db: Session = Depends(get_db)):
-    return crud.get_users(db, role=role)
+async def read_users(role: str = None, db: AsyncDB = Depends(get_async_db)):
+    return await crud_async.get_users(db, role=role)
 
 @router.get("/bugs/{bug_id}/predictions")
-async def read_bug_predictions(bug_id: int, db: Session = Depends(get_db)):
-    pred = crud.get_prediction_by_bug(db, bug_id)
+async def read_bug_predictions(bug_id: int, db: AsyncDB = Depends(get_async_db)):
+    pred = await crud_async.get_prediction_by_bug(db, bug_id)
     if not pred:
         raise HTTPException(status_code=404, detail="Prediction not found")
     import json
@@ -240,25 +217,105 @@ async def read_bug_predictions(bug_id: int, db: Session = Depends(get_db)):
         "threshold": pred.threshold_used
     }
 
+@router.get("/bugs/{bug_id}/similar")
+async def read_similar_bugs(bug_id: int, limit: int = Query(10, ge=1, le=100), min_similarity: float = Query(0.3, ge=0.0, le=1.0),
+                            db: AsyncDB = Depends(get_async_db)):
+    """Near-duplicates of a stored bug by estimated Jaccard similarity of its preprocessed text."""
+    def lookup(session):
+        bug = crud.get_bug(session, bug_id)
+        if not bug:
+            return None, None
+        sig = similarity_index.signature_of(session, bug_id)
+        if sig is None:
+            return bug, None
+        matches = similarity_index.similar(session, sig, threshold=min_similarity, limit=limit, exclude=bug_id)
+        titles = crud.get_bug_titles(session, [match_id for match_id, _ in matches])
+        return bug, [
+            {"bug_id": match_id, "title": titles[match_id], "similarity": round(score, 3)}
+            for match_id, score in matches if match_id in titles
+        ]
+
+    bug, similar = await db.run(lookup)
+    if not bug:
+        raise HTTPException(status_code=404, detail="Bug not found")
+    if similar is None:
+        raise HTTPException(status_code=404, detail="No similarity signature for this bug (run scripts/backfill_signatures.py)")
+    return {"bug_id": bug_id, "similar": similar}
+
 @router.post("/bugs/{bug_id}/assign")
-async def manual_assign(bug_id: int, update: schemas.AssignmentUpdate, db: Session = Depends(get_db)):
-    crud.create_assignment(db, bug_id, update.developer_name, "manual", update.developer_id)
+async def manual_assign(bug_id: int, update: schemas.AssignmentUpdate, db: AsyncDB = Depends(get_async_db)):
+    try:
+        await crud_async.create_assignment(db, bug_id, update.developer_name, "manual", update.developer_id)
+    except IntegrityError:
+        # Foreign keys are enforced: developer_id must name an existing user
+        raise HTTPException(status_code=400, detail=f"Unknown developer_id {update.developer_id}")
     return {"message": "Assignment updated successfully"}
 
 @router.delete("/bugs/{bug_id}")
-async def delete_bug(bug_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_bug(db, bug_id)
+async def delete_bug(bug_id: int, db: AsyncDB = Depends(get_async_db)):
+    success = await crud_async.delete_bug(db, bug_id)
     if not success:
         raise HTTPException(status_code=404, detail="Bug not found")
+    similarity_index.remove_many([bug_id])
     return {"message": "Bug deleted successfully"}
 
 @router.post("/bugs/bulk-delete")
-async def bulk_delete_bugs(req: schemas.BulkDeleteRequest, db: Session = Depends(get_db)):
-    count = crud.delete_bugs(db, req.bug_ids)
-    return {"message": f"Successfully deleted {count} bugs"}
+async def bulk_delete_bugs(req: schemas.BulkDeleteRequest, db: AsyncDB = Depends(get_async_db)):
+    if req.archive:
+        count = await crud_async.archive_bugs(db, req.bug_ids)
+    else:
+        count = await crud_async.delete_bugs(db, req.bug_ids)
+    similarity_index.remove_many(req.bug_ids)
+    return {"message": f"Successfully {'archived' if req.archive else 'deleted'} {count} bugs"}
+
+@router.post("/bugs/archive")
+async def archive_closed_bugs(req: schemas.ArchiveRequest, db: AsyncDB = Depends(get_async_db)):
+    """Move closed bugs not updated for `older_than_days` into bugs_archive."""
+    older_than_days = req.older_than_days if req.older_than_days is not None else config.ARCHIVE_CLOSED_AFTER_DAYS
+    bug_ids = await crud_async.stale_closed_bug_ids(db, older_than_days)
+    count = await crud_async.archive_bugs(db, bug_ids) if bug_ids else 0
+    similarity_index.remove_many(bug_ids)
+    return {"archived_count": count, "older_than_days": older_than_days}
 
 @router.get("/health")
 async def health_check():
-    if assigner.model and assigner.vectorizer and assigner.encoder:
-        return {"status": "healthy", "model_loaded": True}
-    return {"status": "unhealthy", "model_loaded": False}
+    assigner = get_assigner()
+    if assigner.is_ready:
+        return {"status": "healthy", "model_loaded": True, "model_status": assigner.status, "model_version": assigner.version}
+    if assigner.status in ("not_loaded", "loading"):
+        return {"status": "loading", "model_loaded": False, "model_status": assigner.status}
+    return {"status": "unhealthy", "model_loaded": False, "model_status": assigner.status, "error": assigner.error}
+
+@router.get("/metrics")
+async def read_metrics():
+    """Serving metrics for tuning the batching window and pool sizes."""
+    return {
+        "micro_batching": predict_batcher.stats(),
+        "prediction_cache": prediction_cache_stats(),
+        "lemma_cache": preprocessing_cache_stats(),
+        "executors": {
+            pool.name: {"pending": pool.pending, "max_pending": pool.max_pending}
+            for pool in (inference_executor, db_executor)
+        }
+    }
+
+@router.get("/admin/models")
+async def list_model_versions():
+    return {
+        "live_version": get_assigner().version,
+        "versions": registry.list_versions(),
+        "reload": assign_developer.reload_state
+    }
+
+@router.post("/admin/models/{version}/activate", status_code=202)
+async def activate_model_version(version: str):
+    """Load a registry version in the background and swap it in once ready.
+
+    In-flight predictions finish on the model they started with."""
+    try:
+        started = assign_developer.activate_version(version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not started:
+        raise HTTPException(status_code=409, detail="Another model reload is already in progress")
+    return {"message": f"Loading model version {version} in the background", "reload": assign_developer.reload_state}
@@ -27,6 +27,16 @@ class PredictionResponse(BaseModel):
     threshold: float
     is_auto_assigned: bool
 
+class BatchPredictRequest(BaseModel):
+    bugs: List[BugCreate] = Field(..., min_length=1, max_length=1000)
+
+class BatchPredictionResponse(BaseModel):
+    total: int
+    processed_count: int
+    error_count: int
+    results: List[PredictionResponse]
+    errors: List[dict] = []
+
 class BugAssignmentResponse(BaseModel):
     developer_name: Optional[str] = None
     assignment_type: str
@@ -69,4 +79,8 @@ class LocalImportRequest(BaseModel):
 
 class BulkDeleteRequest(BaseModel):
     bug_ids: List[int]
+    archive: bool = False # move to bugs_archive instead of deleting
+
+class ArchiveRequest(BaseModel):
+    older_than_days: Optional[int] = Field(default=None, ge=0) # defaults to config.ARCHIVE_CLOSED_AFTER_DAYS
 
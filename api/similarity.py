@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+from api import models
+from src.config import config
+from src.prediction.assign_developer import get_assigner
+from src.utils.helpers import TTLCache, chunked
+from src.utils.minhash_lsh import LSHIndex, MinHasher, shingles
+
+hasher = MinHasher(config.MINHASH_NUM_PERM)
+
+# Signatures keyed by raw title + body, sized like the prediction cache so a
+# re-filed bug that skips preprocessing for its prediction skips it here too
+signature_cache = TTLCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_TTL)
+_MISSING = object()
+
+def bug_signature(title: str, body: str, clean_text: str = None):
+    """MinHash of the bug's model input text, or None when nothing is left to shingle.
+
+    Pass `clean_text` when it is already at hand (predict_many_with_text);
+    otherwise the text is scrubbed and preprocessed here. CPU-bound in that
+    case, so the API computes signatures on the inference pool.
+    """
+    key = hashlib.sha1(f"{title or ''}\0{body or ''}".encode("utf-8")).hexdigest()
+    sig = signature_cache.get(key, _MISSING)
+    if sig is not _MISSING:
+        return sig
+    if clean_text is None:
+        assigner = get_assigner()
+        clean_text = assigner.clean_texts([assigner.combined_text(title, body)])[0]
+    shingle_set = shingles(clean_text.split(), config.MINHASH_SHINGLE_SIZE)
+    sig = hasher.signature(shingle_set) if shingle_set else None
+    signature_cache.set(key, sig)
+    return sig
+
+class BugSimilarityIndex:
+    """In-memory LSH index over the signatures stored in bug_signatures.
+
+    Rows are the source of truth: the index is filled from the table on first
+    use and catches up on rows written by other workers before each lookup.
+    Local inserts are added right away.
+
+    Catch-up reads the rows above the highest bug_id seen, plus any row in the
+    SIMILARITY_REFRESH_WINDOW ids below it that the index doesn't have yet:
+    ids are handed out in order but, outside SQLite, transactions can commit
+    out of order, so a lower id can become visible after a higher one.
+    """
+
+    def __init__(self):
+        self.lsh = LSHIndex(config.MINHASH_NUM_PERM, config.LSH_BANDS)
+        self.last_bug_id = 0
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, db: Session):
+        # Read the rows before taking the lock: on an AsyncSession the query
+        # yields to the event loop, and a thread lock held across that would
+        # block the loop thread for the next request that gets here
+        last_bug_id = self.last_bug_id
+        # Ids only (primary key index) for the window, signatures for the gaps
+        window_ids = (
+            db.query(models.BugSignature.bug_id)
+            .filter(models.BugSignature.bug_id > last_bug_id - config.SIMILARITY_REFRESH_WINDOW,
+                    models.BugSignature.bug_id <= last_bug_id)
+            .all()
+        )
+        late_ids = [bug_id for (bug_id,) in window_ids if bug_id not in self.lsh]
+        query = db.query(models.BugSignature.bug_id, models.BugSignature.signature)
+        rows = query.filter(models.BugSignature.bug_id > last_bug_id).order_by(models.BugSignature.bug_id).all()
+        for batch in chunked(late_ids, 500):
+            rows += query.filter(models.BugSignature.bug_id.in_(batch)).all()
+        with self._refresh_lock:
+            for bug_id, blob in rows:
+                self.last_bug_id = max(self.last_bug_id, bug_id)
+                if bug_id in self.lsh:
+                    continue
+                sig = np.frombuffer(blob, dtype=np.uint32)
+                # Rows hashed with a different MINHASH_NUM_PERM can't be compared
+                if sig.shape[0] == config.MINHASH_NUM_PERM:
+                    self.lsh.add(bug_id, sig)
+
+    def add_many(self, pairs):
+        for bug_id, sig in pairs:
+            if sig is not None:
+                self.lsh.add(bug_id, sig)
+
+    def remove_many(self, bug_ids):
+        for bug_id in bug_ids:
+            self.lsh.remove(bug_id)
+
+    def signature_of(self, db: Session, bug_id: int):
+        self.refresh(db)
+        return self.lsh.signatures.get(bug_id)
+
+    def similar(self, db: Session, sig, threshold: float = 0.0, limit: int = 10, exclude: int = None):
+        """Stored bugs whose estimated Jaccard similarity to `sig` is >= threshold."""
+        self.refresh(db)
+        return self.lsh.query(sig, threshold=threshold, exclude=exclude, limit=limit)
+
+similarity_index = BugSimilarityIndex()
+
+def signature_bytes(sig):
+    return None if sig is None else np.asarray(sig, dtype=np.uint32).tobytes()
@@ -1,17 +1,101 @@
-from sqlalchemy import create_engine
+import importlib.util
+import re
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[1]
-DATABASE_URL = f"sqlite:///{BASE_DIR}/database/bug_triaging.db"
+sys.path.append(str(BASE_DIR))
+from src.config import config
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+DATABASE_URL = config.DATABASE_URL
+
+# Async driver per backend; used when installed (see config.DB_ASYNC)
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+# The text form SQLAlchemy's SQLite DateTime stores ("2024-01-01 10:00:00.000000").
+# Timestamps written from SQL must match it, since SQLite compares them as strings
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%f000"
+SQLITE_DATETIME_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9].[0-9][0-9][0-9][0-9][0-9][0-9]"
+SQLITE_NOW = f"strftime('{SQLITE_DATETIME_FORMAT}', 'now')"
+
+def is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def apply_sqlite_pragmas(dbapi_conn, connection_record=None):
+    """Per-connection SQLite tuning, see the DATABASE section of config.py."""
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f"PRAGMA journal_mode = {config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size = -{config.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size = {config.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout = {config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    # Enforce REFERENCES clauses, including ON DELETE CASCADE (off by default in SQLite)
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.close()
+
+def _engine_options(url) -> dict:
+    options = {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True
+    }
+    if is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return options
+
+def create_db_engine(url: str = DATABASE_URL):
+    """Engine with a bounded connection pool and, on SQLite, the pragmas applied on connect."""
+    db_engine = create_engine(url, **_engine_options(url))
+    if is_sqlite(url):
+        event.listen(db_engine, "connect", apply_sqlite_pragmas)
+    return db_engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str = DATABASE_URL):
+    """`url` rewritten for its async driver, or None if that driver isn't installed."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if config.DB_ASYNC == "0" or not driver or importlib.util.find_spec(driver) is None:
+        return None
+    # SQLAlchemy's asyncio extension also needs greenlet
+    if importlib.util.find_spec("greenlet") is None:
+        return None
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_session_factory():
+    """async_sessionmaker bound to the async engine (created on first use), or None
+    when no async driver is available and callers should use SessionLocal."""
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        url = async_database_url()
+        if url is None:
+            return None
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        options = _engine_options(url)
+        options.get("connect_args", {}).pop("check_same_thread", None)
+        _async_engine = create_async_engine(url, **options)
+        if is_sqlite(url):
+            event.listen(_async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_session_factory
+
+async def dispose_async_engine():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
 Base = declarative_base()
 
 def get_db():
@@ -26,17 +110,202 @@ def init_db():
     # We call this in app.py or a migration script
     import api.models
     Base.metadata.create_all(bind=engine)
-    
-    # Optional: Run the SQL schema file for extra constraints/seeds not captured in models 
-    # (though usually we'd do this via SQLAlchemy)
+    if is_sqlite(DATABASE_URL):
+        run_migrations()
+    # Other backends start from create_all, which already has every column and
+    # index; the migrations below only upgrade SQLite files made by older versions
+
+def _apply_schema_script():
+    # Extras for a new database: the tables without a model (manual_reviews,
+    # training_data) and the seed users. create_all has already made every
+    # model table, so the script defines no DDL for those. Runs once (at
+    # user_version 0), not on every boot.
     schema_path = BASE_DIR / "database/db_schema.sql"
-    if schema_path.exists():
-        with open(schema_path, "r") as f:
-            sql = f.read()
-            with engine.connect() as conn:
-                # SQLite execute script can be tricky via engine.execute
-                # Better to use raw connection for script execution
-                import sqlite3
-                raw_conn = sqlite3.connect(str(BASE_DIR / "database/bug_triaging.db"))
-                raw_conn.executescript(sql)
-                raw_conn.close()
+    if not schema_path.exists():
+        return
+    with open(schema_path, "r") as f:
+        sql = f.read()
+    # executescript needs the raw DBAPI connection; this one comes from the pool
+    raw_conn = engine.raw_connection()
+    try:
+        raw_conn.driver_connection.executescript(sql)
+    finally:
+        raw_conn.close()
+
+def _add_title_hash(conn):
+    # Databases created before bugs.title_hash existed: add, index and backfill it
+    from src.utils.helpers import title_hash
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(bugs)")]
+    if "title_hash" not in columns:
+        conn.exec_driver_sql("ALTER TABLE bugs ADD COLUMN title_hash VARCHAR(16)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bugs_title_hash ON bugs (title_hash)")
+    rows = conn.exec_driver_sql("SELECT id, title FROM bugs WHERE title_hash IS NULL").fetchall()
+    if rows:
+        conn.exec_driver_sql(
+            "UPDATE bugs SET title_hash = ? WHERE id = ?",
+            [(title_hash(title), bug_id) for bug_id, title in rows]
+        )
+
+def _add_stats_indexes(conn):
+    # Dashboard aggregates: counts by status, latest assignment per bug
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bugs_status ON bugs (status)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bug_assignments_bug_id_id ON bug_assignments (bug_id, id)")
+
+def _add_bug_list_indexes(conn):
+    # Keyset pagination of GET /bugs, newest first, optionally filtered by status
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bugs_created_at_id ON bugs (created_at, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bugs_status_created_at_id ON bugs (status, created_at, id)")
+    # Latest prediction per bug for the listed page
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_model_predictions_bug_id_id ON model_predictions (bug_id, id)")
+
+def _add_query_pattern_indexes(conn):
+    # GET /bugs?source=..., GET /users?role=...
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bugs_source_created_at_id ON bugs (source, created_at, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_users_role ON users (role)")
+    # Foreign keys into bugs / model_predictions from tables without an ORM
+    # model, so deleting a bug doesn't scan them
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_manual_reviews_bug_id ON manual_reviews (bug_id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_manual_reviews_prediction_id ON manual_reviews (prediction_id)")
+
+# Tables holding rows that belong to a bug, rebuilt by _cascade_bug_deletes
+BUG_CHILD_TABLES = ["model_predictions", "bug_assignments", "github_issues", "bug_signatures",
+                    "manual_reviews", "training_data"]
+_BUG_REFERENCE = re.compile(r'(REFERENCES\s+"?bugs"?\s*\(\s*"?id"?\s*\))(?!\s*ON DELETE)', re.IGNORECASE)
+_PREDICTION_REFERENCE = re.compile(r'(REFERENCES\s+"?model_predictions"?\s*\(\s*"?id"?\s*\))(?!\s*ON DELETE)', re.IGNORECASE)
+
+def _table_sql(conn, table):
+    return conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).scalar()
+
+def _rebuild_table(conn, table, new_sql):
+    # SQLite can't alter columns or constraints in place: create the table
+    # from new_sql under a temporary name, copy the rows (same column order),
+    # swap it in and restore the indexes
+    indexes = [row[0] for row in conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+    )]
+    sequence = None
+    if _table_sql(conn, "sqlite_sequence") is not None:
+        sequence = conn.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).scalar()
+    new_sql = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {table}_new", new_sql, count=1)
+    conn.exec_driver_sql(new_sql)
+    conn.exec_driver_sql(f"INSERT INTO {table}_new SELECT * FROM {table}")
+    conn.exec_driver_sql(f"DROP TABLE {table}")
+    conn.exec_driver_sql(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for index_sql in indexes:
+        conn.exec_driver_sql(index_sql)
+    if sequence is not None:
+        # Copying the rows set the counter to their max id; keep the old floor
+        copied = conn.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).scalar() or 0
+        conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+        conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, max(sequence, copied)))
+
+def _rebuild_with_cascades(conn, table):
+    # Same table with ON DELETE clauses added to its references
+    sql = _table_sql(conn, table)
+    if sql is None:
+        return
+    new_sql = _BUG_REFERENCE.sub(r"\1 ON DELETE CASCADE", sql)
+    new_sql = _PREDICTION_REFERENCE.sub(r"\1 ON DELETE SET NULL", new_sql)
+    if new_sql != sql:
+        _rebuild_table(conn, table, new_sql)
+
+def _cascade_bug_deletes(conn):
+    # Deleting a bug removes its predictions, assignments, GitHub link,
+    # signature, reviews and training row in the database itself
+    tables = {name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    # Rows left behind by deletes that ran without foreign key enforcement
+    for table in BUG_CHILD_TABLES:
+        if table in tables:
+            conn.exec_driver_sql(f"DELETE FROM {table} WHERE bug_id NOT IN (SELECT id FROM bugs)")
+    if "manual_reviews" in tables:
+        conn.exec_driver_sql(
+            "UPDATE manual_reviews SET prediction_id = NULL WHERE prediction_id NOT IN (SELECT id FROM model_predictions)"
+        )
+    for column in ("developer_id", "assigned_by_id"):
+        conn.exec_driver_sql(f"UPDATE bug_assignments SET {column} = NULL WHERE {column} NOT IN (SELECT id FROM users)")
+    for table in BUG_CHILD_TABLES:
+        _rebuild_with_cascades(conn, table)
+
+def _autoincrement_bug_ids(conn):
+    # Plain INTEGER PRIMARY KEY hands the highest id out again once that bug
+    # is deleted or archived; the similarity index watermark and
+    # bugs_archive.bug_id both need ids that are never reused
+    sql = _table_sql(conn, "bugs")
+    if "AUTOINCREMENT" not in sql.upper():
+        new_sql = re.sub(r'\bid INTEGER NOT NULL,', "id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,", sql, count=1)
+        new_sql = re.sub(r'\s*PRIMARY KEY \(id\),', "", new_sql, count=1)
+        _rebuild_table(conn, "bugs", new_sql)
+    # Start above every id handed out so far, including archived bugs
+    highest = conn.exec_driver_sql(
+        "SELECT MAX(COALESCE((SELECT MAX(id) FROM bugs), 0), COALESCE((SELECT MAX(bug_id) FROM bugs_archive), 0))"
+    ).scalar()
+    conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'bugs'")
+    conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('bugs', ?)", (highest,))
+
+def _require_bug_created_at(conn):
+    # (created_at, id) is the GET /bugs cursor: a NULL created_at can't be
+    # encoded and drops out of keyset comparisons, so backfill and forbid it
+    conn.exec_driver_sql(
+        f"UPDATE bugs SET created_at = COALESCE(updated_at, {SQLITE_NOW}) WHERE created_at IS NULL"
+    )
+    sql = _table_sql(conn, "bugs")
+    new_sql = re.sub(r'\bcreated_at (DATETIME|TIMESTAMP)(?! NOT NULL)', r"created_at \1 NOT NULL", sql, count=1)
+    if new_sql != sql:
+        _rebuild_table(conn, "bugs", new_sql)
+
+def _reset_bug_signatures(conn):
+    # MinHasher's hash family changed, so stored signatures no longer compare
+    # with new ones. Drop them; scripts/backfill_signatures.py recomputes them
+    conn.exec_driver_sql("DELETE FROM bug_signatures")
+
+def _normalize_bug_timestamps(conn):
+    # Rows written by raw SQL or the schema's old CURRENT_TIMESTAMP default hold
+    # "2024-01-01 10:00:00", which sorts before the "2024-01-01 10:00:00.000000"
+    # SQLAlchemy binds for the same instant, so a GET /bugs cursor taken from
+    # such a row matched that row again. Rewrite them in SQLAlchemy's format
+    for column in ("created_at", "updated_at"):
+        conn.exec_driver_sql(
+            f"UPDATE bugs SET {column} = strftime('{SQLITE_DATETIME_FORMAT}', {column}) "
+            f"WHERE {column} IS NOT NULL AND {column} NOT GLOB '{SQLITE_DATETIME_GLOB}' "
+            f"AND strftime('{SQLITE_DATETIME_FORMAT}', {column}) IS NOT NULL"
+        )
+
+# Schema changes create_all can't apply to existing tables, in order.
+# PRAGMA user_version records how many have run on this database.
+MIGRATIONS = [
+    _add_title_hash,
+    _add_stats_indexes,
+    _add_bug_list_indexes,
+    _add_query_pattern_indexes,
+    _cascade_bug_deletes,
+    _autoincrement_bug_ids,
+    _require_bug_created_at,
+    _reset_bug_signatures,
+    _normalize_bug_timestamps,
+]
+
+def run_migrations():
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    if version == 0:
+        _apply_schema_script()
+    if version >= len(MIGRATIONS):
+        return
+    with engine.connect() as conn:
+        # Table rebuilds drop and recreate tables: with foreign keys on, dropping
+        # bugs would cascade into every child table. The pragma can only change
+        # outside a transaction, so switch it off first and check at the end
+        conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conn.commit()
+        try:
+            with conn.begin():
+                for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                    print(f"Applying database migration {number}: {migration.__name__}")
+                    migration(conn)
+                    conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+                violations = conn.exec_driver_sql("PRAGMA foreign_key_check").fetchall()
+                if violations:
+                    raise RuntimeError(f"Migrations left {len(violations)} foreign key violations, e.g. {violations[0]}")
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys = ON")
+            conn.commit()
@@ -17,13 +17,15 @@ def debug_info():
         bug_count = db.query(models.Bug).count()
         print(f"Total bugs in database: {bug_count}")
         
+        assigner.ensure_loaded()
+        print(f"Model status: {assigner.status}")
         print(f"Model loaded: {assigner.model is not None}")
         print(f"Vectorizer loaded: {assigner.vectorizer is not None}")
         print(f"Encoder loaded: {assigner.encoder is not None}")
         
         if assigner.model is None:
             print("Trying to load model...")
-            assigner._load_model()
+            assigner.load_models()
             print(f"Model loaded after retry: {assigner.model is not None}")
             
         # Check for GitHub token
@@ -0,0 +1,40 @@
+from database.db_connection import SessionLocal
+from api import models
+from api.similarity import bug_signature, signature_bytes
+from src.prediction.assign_developer import get_assigner
+from src.utils.helpers import chunked
+
+BATCH_SIZE = 500
+
+def backfill_signatures():
+    """Compute MinHash signatures for bugs stored before near-duplicate detection existed."""
+    # Signatures are taken over the model's input text, which needs its name scrubber
+    get_assigner().ensure_loaded()
+    db = SessionLocal()
+    try:
+        missing = (
+            db.query(models.Bug.id, models.Bug.title, models.Bug.body)
+            .outerjoin(models.BugSignature, models.BugSignature.bug_id == models.Bug.id)
+            .filter(models.BugSignature.bug_id == None)
+            .all()
+        )
+        print(f"Found {len(missing)} bugs without a similarity signature. Starting backfill...")
+
+        done = 0
+        for batch in chunked(missing, BATCH_SIZE):
+            for bug_id, title, body in batch:
+                sig = bug_signature(title, body)
+                if sig is not None:
+                    db.add(models.BugSignature(bug_id=bug_id, signature=signature_bytes(sig)))
+            db.commit()
+            done += len(batch)
+            print(f"Signed {done}/{len(missing)} bugs")
+        print("Backfill complete.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_signatures()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api import crud, models, schemas
+from database.db_connection import Base, create_db_engine
+
+WRITERS = 8
+BUGS_PER_WRITER = 100
+READERS = 4
+THRESHOLD = 0.40
+
+def writer(Session, worker_id, errors):
+    db = Session()
+    payload = {"predictions": [{"predicted_developer": "alice", "confidence": 0.7}], "threshold": THRESHOLD,
+               "is_auto_assigned": True, "tags": "Terminal", "matched_from_source": False}
+    try:
+        for i in range(BUGS_PER_WRITER):
+            report = schemas.BugCreate(title=f"Writer {worker_id} bug {i}", body="Terminal freezes ...", source="github")
+            try:
+                crud.create_triaged_bug(db, report, "Terminal", payload, THRESHOLD, "alice", "auto")
+            except Exception as e:
+                errors.append(str(e).splitlines()[0])
+    finally:
+        db.close()
+
+def reader(Session, stop, reads):
+    db = Session()
+    try:
+        while not stop.is_set():
+            crud.get_dashboard_stats(db)
+            db.rollback()
+            reads.append(1)
+    finally:
+        db.close()
+
+def run(label, db_engine):
+    Base.metadata.create_all(bind=db_engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    errors, reads, stop = [], [], threading.Event()
+    readers = [threading.Thread(target=reader, args=(Session, stop, reads)) for _ in range(READERS)]
+    writers = [threading.Thread(target=writer, args=(Session, w, errors)) for w in range(WRITERS)]
+    for t in readers:
+        t.start()
+    start = time.perf_counter()
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    seconds = time.perf_counter() - start
+    stop.set()
+    for t in readers:
+        t.join()
+
+    db = Session()
+    written = db.query(models.Bug).count()
+    db.close()
+    db_engine.dispose()
+    print(f"{label:<28} {written / seconds:>8.0f} bugs/s  {len(reads) / seconds:>8.0f} stats reads/s  "
+          f"{written} written, {len(errors)} failed")
+    if errors:
+        print(f"  first error: {errors[0]}")
+
+def main():
+    print(f"{WRITERS} writer threads x {BUGS_PER_WRITER} bugs, {READERS} concurrent /stats readers")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Previous setup: default journal, no pragmas, default pool
+        baseline = create_engine(f"sqlite:///{os.path.join(tmp, 'baseline.db')}", connect_args={"check_same_thread": False})
+        run("rollback journal (before)", baseline)
+        run("WAL + pragmas + pool", create_db_engine(f"sqlite:///{os.path.join(tmp, 'tuned.db')}"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from api import models
+from database.db_connection import Base
+from src.utils.helpers import chunked, title_hash
+
+TABLE_SIZES = (10_000, 100_000, 500_000)
+LOOKUPS = 200
+
+def grow_table(db, current, target):
+    rows = ({"title": f"Issue {i}: editor freezes when opening large files", "body": "..."} for i in range(current, target))
+    for batch in chunked(rows, 20_000):
+        db.execute(insert(models.Bug), batch)
+    db.commit()
+
+def time_lookups(db, titles, by_hash):
+    start = time.perf_counter()
+    for title in titles:
+        if by_hash:
+            db.query(models.Bug.id).filter(models.Bug.title_hash == title_hash(title)).first()
+        else:
+            db.query(models.Bug.id).filter(models.Bug.title == title).first()
+    return (time.perf_counter() - start) / len(titles) * 1000
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'dedupe.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        size = 0
+        print(f"{'rows':>8}  {'title scan (ms)':>16}  {'title_hash index (ms)':>22}")
+        for target in TABLE_SIZES:
+            grow_table(db, size, target)
+            size = target
+            # Misses are the common case when importing new issues, and the worst case for a scan
+            titles = [f"New issue {i}" for i in range(LOOKUPS)]
+            print(f"{size:>8}  {time_lookups(db, titles, False):>16.3f}  {time_lookups(db, titles, True):>22.3f}")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api import crud, models, schemas
+from database.db_connection import Base
+
+N_BUGS = 300
+THRESHOLD = 0.40
+
+def make_session(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+def sample_reports(n):
+    reports = []
+    for i in range(n):
+        report = schemas.BugCreate(title=f"Terminal crashes on startup #{i}", body="Steps to reproduce ...", priority="medium", source="manual")
+        payload = {
+            "predictions": [{"predicted_developer": "alice", "confidence": 0.7}, {"predicted_developer": "bob", "confidence": 0.2}],
+            "threshold": THRESHOLD,
+            "is_auto_assigned": True,
+            "tags": "Terminal",
+            "matched_from_source": False
+        }
+        reports.append((report, payload))
+    return reports
+
+def ingest_legacy(db, reports):
+    # Previous path: three commits (and refreshes) per bug, plus a re-query of the bug
+    for report, payload in reports:
+        db_bug = crud.create_bug(db, report, tags="Terminal")
+        crud.create_prediction(db, db_bug.id, payload, THRESHOLD)
+        crud.create_assignment(db, db_bug.id, "alice", "auto")
+
+def ingest_single_transaction(db, reports):
+    for report, payload in reports:
+        crud.create_triaged_bug(db, report, "Terminal", payload, THRESHOLD, "alice", "auto")
+
+def main():
+    reports = sample_reports(N_BUGS)
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, ingest in (("legacy (3 commits/bug)", ingest_legacy), ("single transaction", ingest_single_transaction)):
+            engine, db = make_session(os.path.join(tmp, f"{ingest.__name__}.db"))
+            start = time.perf_counter()
+            ingest(db, reports)
+            timings[name] = time.perf_counter() - start
+            rows = (db.query(models.Bug).count(), db.query(models.ModelPrediction).count(), db.query(models.BugAssignment).count())
+            db.close()
+            engine.dispose()
+            print(f"{name:<24} {timings[name]:.2f}s  ({N_BUGS / timings[name]:.0f} bugs/s, rows: {rows})")
+
+    legacy, single = timings.values()
+    print(f"Speedup: {legacy / single:.1f}x")
+
+if __name__ == "__main__":
+    main()
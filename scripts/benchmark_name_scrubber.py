@@ -0,0 +1,55 @@
+import random
+import re
+import string
+import time
+from src.preprocessing.name_scrubber import NameScrubber
+from src.preprocessing.preprocess_dataset import RAW_DATA_FILE, load_data, get_assignee_blacklist
+
+def legacy_remove_names(text, blacklist):
+    # Previous implementation: sorts, escapes and rebuilds the regex per document
+    if not text:
+        return ""
+    sorted_names = sorted(list(blacklist), key=len, reverse=True)
+    escaped_names = [re.escape(name) for name in sorted_names]
+    pattern = r'\b(?:' + '|'.join(escaped_names) + r')\b'
+    return re.sub(pattern, "[LEAKAGE_REMOVED]", text.lower(), flags=re.IGNORECASE)
+
+def synthetic_corpus(n_docs=9000, n_names=400):
+    random.seed(42)
+    names = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 12))) for _ in range(n_names)]
+    words = ["crash", "editor", "terminal", "when", "opening", "file", "extension", "error", "the", "after", "update"]
+    docs = []
+    for _ in range(n_docs):
+        tokens = random.choices(words, k=80) + random.choices(names, k=2)
+        random.shuffle(tokens)
+        docs.append({"title": " ".join(tokens[:8]), "body": " ".join(tokens[8:]), "assignee": random.choice(names)})
+    return docs
+
+def main():
+    try:
+        data = load_data()
+        print(f"Benchmarking on {len(data)} issues from {RAW_DATA_FILE}")
+    except FileNotFoundError:
+        data = synthetic_corpus()
+        print(f"Raw corpus not found, benchmarking on {len(data)} synthetic issues")
+
+    blacklist = get_assignee_blacklist(data)
+    texts = [f"{item.get('title', '') or ''} {item.get('body', '') or ''}" for item in data]
+
+    start = time.perf_counter()
+    legacy = [legacy_remove_names(t, blacklist) for t in texts]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scrubber = NameScrubber(blacklist)
+    scrubbed = [scrubber.scrub(t) for t in texts]
+    scrubber_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, scrubbed) if a != b)
+    print(f"Legacy remove_names: {legacy_seconds:.2f}s")
+    print(f"NameScrubber:        {scrubber_seconds:.2f}s (incl. compile)")
+    print(f"Speedup:             {legacy_seconds / scrubber_seconds:.1f}x")
+    print(f"Mismatched outputs:  {mismatches}")
+
+if __name__ == "__main__":
+    main()
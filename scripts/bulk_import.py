@@ -0,0 +1,35 @@
+import sys
+import time
+from database.db_connection import SessionLocal
+from api.ingestion import build_matcher, ingest_issues
+from src.config import config
+from src.utils.helpers import chunked, iter_records
+
+BATCH_SIZE = 1000
+
+def bulk_import(path, source="local"):
+    """Backfill the bugs table from a .jsonl / .json file of issues.
+
+    The file is streamed in batches; each batch is deduplicated, tagged,
+    predicted and inserted in a single transaction.
+    """
+    db = SessionLocal()
+    totals = {"imported": 0, "skipped": 0, "errors": 0}
+    start = time.perf_counter()
+    try:
+        matcher = build_matcher(db)
+        for batch in chunked(iter_records(path), BATCH_SIZE):
+            outcome = ingest_issues(db, batch, source, matcher)
+            totals["imported"] += len(outcome["imported"])
+            totals["skipped"] += len(outcome["skipped_titles"])
+            totals["errors"] += len(outcome["errors"])
+            print(f"Imported {totals['imported']}, skipped {totals['skipped']}, errors {totals['errors']}")
+    finally:
+        db.close()
+    print(f"Done in {time.perf_counter() - start:.1f}s: {totals}")
+    return totals
+
+if __name__ == "__main__":
+    # Usage: python scripts/bulk_import.py [issues.jsonl] [source]
+    data_path = sys.argv[1] if len(sys.argv) > 1 else config.RAW_DATA_FILE
+    bulk_import(data_path, sys.argv[2] if len(sys.argv) > 2 else "local")
@@ -0,0 +1,82 @@
+import io
+import json
+import time
+from collections import Counter
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from src.config import config
+from src.feature_engineering.vectorizers import build_vectorizer
+from src.utils.helpers import iter_records
+
+REPORT_FILE = config.BASE_DIR / "docs/reports/feature_backend_comparison.json"
+LATENCY_RUNS = 200
+
+def load_dataset():
+    texts, assignees = [], []
+    for item in iter_records(config.PROCESSED_DATA_FILE):
+        if item.get("combined_text") and item.get("assignee"):
+            texts.append(item["combined_text"])
+            assignees.append(item["assignee"])
+    # Same rare-class grouping as tfidf_vectorizer.py
+    counts = Counter(assignees)
+    labels = [name if counts[name] >= 100 else "Other" for name in assignees]
+    return texts, LabelEncoder().fit_transform(labels)
+
+def evaluate(backend, train_texts, test_texts, y_train, y_test):
+    vectorizer = build_vectorizer(backend)
+
+    start = time.perf_counter()
+    X_train = vectorizer.fit_transform(train_texts)
+    fit_seconds = time.perf_counter() - start
+
+    buffer = io.BytesIO()
+    joblib.dump(vectorizer, buffer)
+    artifact_bytes = buffer.tell()
+    buffer.seek(0)
+    start = time.perf_counter()
+    joblib.load(buffer)
+    load_seconds = time.perf_counter() - start
+
+    # Single-document latency, the shape of a /predict call
+    start = time.perf_counter()
+    for i in range(LATENCY_RUNS):
+        vectorizer.transform([test_texts[i % len(test_texts)]])
+    transform_ms = (time.perf_counter() - start) / LATENCY_RUNS * 1000
+
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(vectorizer.transform(test_texts))
+
+    return {
+        "features": X_train.shape[1],
+        "fit_seconds": round(fit_seconds, 2),
+        "artifact_mb": round(artifact_bytes / 1e6, 2),
+        "load_seconds": round(load_seconds, 3),
+        "transform_ms_per_doc": round(transform_ms, 3),
+        "accuracy": round(accuracy_score(y_test, y_pred), 4),
+        "macro_f1": round(f1_score(y_test, y_pred, average="macro", zero_division=0), 4)
+    }
+
+def main():
+    texts, y = load_dataset()
+    train_texts, test_texts, y_train, y_test = train_test_split(
+        texts, y, test_size=0.2, random_state=42, stratify=y
+    )
+    print(f"Comparing feature backends on {len(train_texts)} train / {len(test_texts)} test documents")
+
+    report = {}
+    for backend in ("tfidf", "hashing"):
+        report[backend] = evaluate(backend, train_texts, test_texts, y_train, y_test)
+        print(backend, report[backend])
+
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved to {REPORT_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import requests
 import os
-import json
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.config import config
+from src.utils.helpers import write_records
 
 # ---------------- CONFIG ----------------
 # Try to load from .env manually if python-dotenv is not available
@@ -38,12 +42,16 @@ def get_headers():
     return headers
 
 def fetch_repo_issues(owner, repo, limit_per_repo=10, state="closed"):
-    collected = []
+    return list(iter_repo_issues(owner, repo, limit_per_repo, state=state))
+
+def iter_repo_issues(owner, repo, limit_per_repo=10, state="closed"):
+    """Yield issues page by page as they arrive from the GitHub API."""
+    collected = 0
     page = 1
     base_url = f"https://api.github.com/repos/{owner}/{repo}/issues"
     headers = get_headers()
 
-    while len(collected) < limit_per_repo:
+    while collected < limit_per_repo:
         params = {
             "state": state,
             "per_page": min(PER_PAGE, limit_per_repo),
@@ -82,7 +90,8 @@ def fetch_repo_issues(owner, repo, limit_per_repo=10, state="closed"):
                 if closed_year < START_YEAR:
                     continue
 
-            collected.append({
+            collected += 1
+            yield {
                 "repository": f"{owner}/{repo}",
                 "issue_id": issue["id"],
                 "issue_number": issue["number"],
@@ -92,27 +101,29 @@ def fetch_repo_issues(owner, repo, limit_per_repo=10, state="closed"):
                 "state": issue["state"],
                 "created_at": issue["created_at"],
                 "closed_at": issue.get("closed_at")
-            })
+            }
 
-            if len(collected) >= limit_per_repo:
+            if collected >= limit_per_repo:
                 break
 
-        print(f"COLLECTED {repo}: {len(collected)} issues")
+        print(f"COLLECTED {repo}: {collected} issues")
         page += 1
 
-    return collected
-
 def fetch_bugs_from_github(total_limit=10, state="open"):
     """
     Higher-level function for fetching bugs from configured repositories.
     """
-    all_collected = []
+    return list(iter_bugs_from_github(total_limit, state=state))
+
+def iter_bugs_from_github(total_limit=10, state="open"):
+    """Streaming variant of fetch_bugs_from_github: yields issues as they are fetched."""
+    collected = 0
     
     # Distribute the limit across repositories
     limit_per_repo = max(1, total_limit // len(REPOSITORIES))
     
     for owner, repo in REPOSITORIES:
-        remaining = total_limit - len(all_collected)
+        remaining = total_limit - collected
         if remaining <= 0:
             break
         
@@ -121,10 +132,9 @@ def fetch_bugs_from_github(total_limit=10, state="open"):
         if owner == REPOSITORIES[-1][0] and repo == REPOSITORIES[-1][1]:
             current_limit = remaining
             
-        repo_issues = fetch_repo_issues(owner, repo, current_limit, state=state)
-        all_collected.extend(repo_issues)
-        
-    return all_collected[:total_limit]
+        for issue in iter_repo_issues(owner, repo, current_limit, state=state):
+            collected += 1
+            yield issue
 
 
 if __name__ == "__main__":
@@ -132,11 +142,10 @@ if __name__ == "__main__":
         raise RuntimeError("GITHUB_PAT not set")
 
     print(f"\nCollecting up to {MAX_TOTAL_ISSUES} issues...")
-    all_issues = fetch_bugs_from_github(total_limit=MAX_TOTAL_ISSUES, state="closed")
-
-    os.makedirs("data/raw", exist_ok=True)
+    config.RAW_DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-    with open("data/raw/github_issues_raw.json", "w", encoding="utf-8") as f:
-        json.dump(all_issues, f, indent=4)
+    # Each issue is written as soon as its page arrives
+    issues = iter_bugs_from_github(total_limit=MAX_TOTAL_ISSUES, state="closed")
+    total = write_records(config.RAW_DATA_FILE, issues)
 
-    print(f"\nDONE: Total collected bugs = {len(all_issues)}")
+    print(f"\nDONE: Total collected bugs = {total} -> {config.RAW_DATA_FILE}")
@@ -1,17 +1,22 @@
-import json
 import joblib
 import numpy as np
+import sys
+import os
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import LabelEncoder
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.config import config
+from src.feature_engineering.vectorizers import build_vectorizer
+from src.utils.helpers import iter_records, resolve_data_file
+
 # =====================================================
 # 1. SETUP PATHS
 # =====================================================
 # Adjust BASE_DIR if your script is in a different subdirectory
 BASE_DIR = Path(__file__).resolve().parents[2]
 
-INPUT_FILE = BASE_DIR / "data/processed/bug_reports_nlp_ready.json"
+INPUT_FILE = config.PROCESSED_DATA_FILE
 FEATURE_DIR = BASE_DIR / "data/features"
 FEATURE_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -22,32 +27,43 @@ LABELS_FILE = FEATURE_DIR / "labels.npy"
 LABEL_ENCODER_FILE = FEATURE_DIR / "label_encoder.pkl"
 
 # =====================================================
-# 2. LOAD AND PREPARE DATA
+# 2. STREAM DATA
 # =====================================================
-print(f"Loading data from: {INPUT_FILE}")
+print(f"Streaming data from: {resolve_data_file(INPUT_FILE)}")
 
-try:
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-except FileNotFoundError:
+if not resolve_data_file(INPUT_FILE).exists():
     print(f"Error: File not found at {INPUT_FILE}")
     exit(1)
 
-# Filter: Keep only issues that have BOTH text and an assignee
-# (We cannot train on bugs with missing assignees)
-valid_data = [
-    item for item in data 
-    if item.get("combined_text") and item.get("assignee")
-]
+# Labels are small, so they are collected in memory while the (much larger)
+# texts are streamed straight into the vectorizer in a single pass.
+assignees = []
+stream_stats = {"documents": 0}
+
+def iter_training_texts():
+    for item in iter_records(INPUT_FILE):
+        stream_stats["documents"] += 1
+        # Filter: Keep only issues that have BOTH text and an assignee
+        # (We cannot train on bugs with missing assignees)
+        if item.get("combined_text") and item.get("assignee"):
+            assignees.append(item["assignee"])
+            yield item["combined_text"]
+
+# =====================================================
+# 3. FEATURE EXTRACTION (TF-IDF or hashing + IDF)
+# =====================================================
+print(f"Vectorizing text with the '{config.FEATURE_BACKEND}' backend (this may take a moment)...")
 
-texts = [item["combined_text"] for item in valid_data]
-assignees = [item["assignee"] for item in valid_data]
+vectorizer = build_vectorizer(config.FEATURE_BACKEND)
 
-print(f"Loaded {len(data)} raw documents")
-print(f"Filtered to {len(texts)} valid training samples (with text & assignee)")
+X = vectorizer.fit_transform(iter_training_texts())
+
+print(f"Loaded {stream_stats['documents']} raw documents")
+print(f"Filtered to {len(assignees)} valid training samples (with text & assignee)")
+print(f"Feature Matrix shape: {X.shape} (Rows, Features)")
 
 # =====================================================
-# 3. GROUP RARE CLASSES & ENCODE LABELS
+# 4. GROUP RARE CLASSES & ENCODE LABELS
 # =====================================================
 print("Grouping rare classes (Threshold: < 100 bugs)...")
 from collections import Counter
@@ -70,27 +86,6 @@ y = label_encoder.fit_transform(new_assignees)
 print(f"Found {len(label_encoder.classes_)} unique assignees (including 'Other')")
 print("   Classes:", label_encoder.classes_)
 
-# =====================================================
-# 4. TF-IDF FEATURE EXTRACTION
-# =====================================================
-print("Vectorizing text (this may take a moment)...")
-
-# Updated for High Accuracy (Trigrams)
-# ngram_range=(1, 3): Captures single words, pairs, and triplets
-vectorizer = TfidfVectorizer(
-    max_features=60000,      # Increased for better trigram coverage
-    stop_words='english',
-    ngram_range=(1, 3),      
-    min_df=2,
-    max_df=0.9,
-    sublinear_tf=True,
-    strip_accents='unicode'
-)
-
-X = vectorizer.fit_transform(texts)
-
-print(f"Feature Matrix shape: {X.shape} (Rows, Features)")
-
 # =====================================================
 # 5. SAVE ARTIFACTS
 # =====================================================
@@ -0,0 +1,39 @@
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+from src.config import config
+
+def build_vectorizer(backend: str = None):
+    """Return an unfitted text vectorizer for the configured feature backend.
+
+    Both backends expose fit_transform/transform, so the saved artifact is used
+    the same way by DeveloperAssigner whichever one was trained.
+    """
+    backend = backend or config.FEATURE_BACKEND
+
+    if backend == "hashing":
+        # n-grams are hashed into a fixed space, so only the IDF vector is
+        # learned and stored. min_df/max_df/max_features need a vocabulary
+        # and don't apply here.
+        return make_pipeline(
+            HashingVectorizer(
+                n_features=config.HASHING_N_FEATURES,
+                stop_words='english',
+                ngram_range=(1, 3),
+                strip_accents='unicode',
+                alternate_sign=False,
+                norm=None
+            ),
+            TfidfTransformer(sublinear_tf=True)
+        )
+
+    # Updated for High Accuracy (Trigrams)
+    # ngram_range=(1, 3): Captures single words, pairs, and triplets
+    return TfidfVectorizer(
+        max_features=60000,      # Increased for better trigram coverage
+        stop_words='english',
+        ngram_range=(1, 3),      
+        min_df=2,
+        max_df=0.9,
+        sublinear_tf=True,
+        strip_accents='unicode'
+    )
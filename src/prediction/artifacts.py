@@ -0,0 +1,59 @@
+import json
+import sys
+import os
+import joblib
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.config import config
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+LEGACY_PATHS = {
+    "model": BASE_DIR / "saved_models/ensemble_model.pkl",
+    "vectorizer": BASE_DIR / "data/features/tfidf_vectorizer.pkl",
+    "encoder": BASE_DIR / "data/features/label_encoder.pkl",
+}
+BUNDLE_FILES = {
+    "model": "ensemble_model.joblib",
+    "vectorizer": "vectorizer.joblib",
+    "encoder": "label_encoder.joblib",
+}
+MANIFEST_FILE = "manifest.json"
+
+def load_artifact(path, mmap: bool = None):
+    """joblib.load, memory-mapping numpy arrays read-only when enabled.
+
+    Arrays in uncompressed joblib files are mapped straight from disk, so every
+    API worker shares one copy through the page cache. Compressed files are
+    loaded normally (joblib ignores mmap_mode for them).
+    """
+    mmap = config.MMAP_ARTIFACTS if mmap is None else mmap
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+def export_bundle(bundle_dir, model, vectorizer, encoder, metadata: dict = None):
+    """Write model, vectorizer and encoder uncompressed into one directory."""
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    for name, obj in (("model", model), ("vectorizer", vectorizer), ("encoder", encoder)):
+        # compress=0 keeps arrays page-aligned and mmap-able
+        joblib.dump(obj, bundle_dir / BUNDLE_FILES[name], compress=0)
+    with open(bundle_dir / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump({"files": BUNDLE_FILES, **(metadata or {})}, f, indent=4)
+    return bundle_dir
+
+def is_bundle(bundle_dir) -> bool:
+    bundle_dir = Path(bundle_dir)
+    return all((bundle_dir / fname).exists() for fname in BUNDLE_FILES.values())
+
+def load_bundle(bundle_dir, mmap: bool = None):
+    bundle_dir = Path(bundle_dir)
+    return tuple(load_artifact(bundle_dir / BUNDLE_FILES[name], mmap) for name in ("model", "vectorizer", "encoder"))
+
+def main():
+    # Convert the training outputs into a memory-mappable bundle
+    model, vectorizer, encoder = (joblib.load(LEGACY_PATHS[name]) for name in ("model", "vectorizer", "encoder"))
+    bundle_dir = export_bundle(config.MODEL_BUNDLE_DIR, model, vectorizer, encoder)
+    print(f"Exported memory-mappable bundle to {bundle_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,229 @@
-import joblib
+import hashlib
+import threading
 import numpy as np
 from pathlib import Path
+from src.config import config
+from src.prediction.artifacts import LEGACY_PATHS, is_bundle, load_artifact, load_bundle
+from src.prediction.model_registry import registry
 from src.preprocessing.nlp_preprocessor import preprocess_text
+from src.preprocessing.name_scrubber import NameScrubber
+from src.utils.helpers import TTLCache
 
 BASE_DIR = Path(__file__).resolve().parents[2]
-MODEL_PATH = BASE_DIR / "saved_models/ensemble_model.pkl"
-VECTORIZER_PATH = BASE_DIR / "data/features/tfidf_vectorizer.pkl"
-ENCODER_PATH = BASE_DIR / "data/features/label_encoder.pkl"
+MODEL_PATH = LEGACY_PATHS["model"]
+VECTORIZER_PATH = LEGACY_PATHS["vectorizer"]
+ENCODER_PATH = LEGACY_PATHS["encoder"]
+
+# Top-n predictions keyed by model version + text, shared by every assigner in
+# this process. Re-filed and re-fetched bugs skip preprocessing and the ensemble.
+prediction_cache = TTLCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_TTL)
 
 class DeveloperAssigner:
-    def __init__(self):
+    def __init__(self, autoload: bool = True, bundle_dir=None, version: str = None):
+        # Explicit bundle to serve; otherwise the registry's current version
+        self.bundle_dir = bundle_dir
+        self.version = version
         self.model = None
         self.vectorizer = None
         self.encoder = None
-        self.load_models()
+        self.scrubber = None
+        # not_loaded -> loading -> ready | failed
+        self.status = "not_loaded"
+        self.error = None
+        self._load_lock = threading.Lock()
+        if autoload:
+            self.load_models()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == "ready"
 
     def load_models(self):
-        try:
-            self.model = joblib.load(MODEL_PATH)
-            self.vectorizer = joblib.load(VECTORIZER_PATH)
-            self.encoder = joblib.load(ENCODER_PATH)
-            print("Models loaded successfully")
-        except Exception as e:
-            print(f"Error loading models: {e}")
+        with self._load_lock:
+            # Another caller may have finished loading while we waited on the lock
+            if self.is_ready:
+                return
+            self.status = "loading"
+            try:
+                bundle_dir = self.resolve_bundle_dir()
+                if bundle_dir:
+                    # Uncompressed bundle: arrays are memory-mapped and shared between workers
+                    self.model, self.vectorizer, self.encoder = load_bundle(bundle_dir)
+                else:
+                    self.model = load_artifact(MODEL_PATH)
+                    self.vectorizer = load_artifact(VECTORIZER_PATH)
+                    self.encoder = load_artifact(ENCODER_PATH)
+                    self.version = "legacy"
+
+                # Scrub assignee names the same way the training data was scrubbed
+                if config.NAME_BLACKLIST_FILE.exists():
+                    self.scrubber = NameScrubber.load(config.NAME_BLACKLIST_FILE)
+
+                self.error = None
+                self.status = "ready"
+                print(f"Models loaded successfully (version: {self.version})")
+            except Exception as e:
+                self.error = str(e)
+                self.status = "failed"
+                print(f"Error loading models: {e}")
+
+    def resolve_bundle_dir(self):
+        """Pick the artifacts to load: explicit bundle, registry CURRENT, then the single bundle dir."""
+        if self.bundle_dir:
+            return self.bundle_dir
+        current = registry.current_version()
+        if current:
+            self.version = current
+            return registry.version_dir(current)
+        if is_bundle(config.MODEL_BUNDLE_DIR):
+            self.version = "bundle"
+            return config.MODEL_BUNDLE_DIR
+        return None
+
+    def load_in_background(self):
+        """Start loading on a daemon thread and return immediately."""
+        if self.status in ("loading", "ready"):
+            return
+        self.status = "loading"
+        threading.Thread(target=self.load_models, name="model-loader", daemon=True).start()
+
+    def ensure_loaded(self):
+        """Load synchronously if needed (waits for an in-flight background load)."""
+        if self.status != "ready" and self.status != "failed":
+            self.load_models()
 
     def predict(self, title: str, body: str, top_n: int = 5):
+        results = self.predict_many([(title, body)], top_n=top_n)
+        return results[0] if results else []
+
+    def predict_many(self, reports, top_n: int = 5):
+        """Predict assignees for a list of (title, body) pairs with one model call."""
+        return self.predict_many_with_text(reports, top_n)[0]
+
+    def predict_many_with_text(self, reports, top_n: int = 5):
+        """predict_many, plus the scrubbed and preprocessed text each prediction was
+        made from so callers can reuse it (None where the raw-text cache answered)."""
+        clean_by_report = [None] * len(reports)
+        self.ensure_loaded()
         if not self.model or not self.vectorizer or not self.encoder:
-            return []
-
-        combined_text = f"{title.strip()} {body.strip()}"
-        clean_text = preprocess_text(combined_text)
-        
-        # Transform text to TF-IDF vector
-        X = self.vectorizer.transform([clean_text])
-        
-        # Get probability scores
-        probs = self.model.predict_proba(X)[0]
-        
-        # Get indices of top_n classes
-        top_indices = np.argsort(probs)[-top_n:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            results.append({
-                "predicted_developer": self.encoder.classes_[idx],
-                "confidence": float(probs[idx])
-            })
-            
-        return results
-
-# Singleton instance
-assigner = DeveloperAssigner()
+            return [], clean_by_report
+        if not reports:
+            return [], clean_by_report
+
+        combined_texts = [self.combined_text(title, body) for title, body in reports]
+        results = [None] * len(reports)
+
+        # 1. Exact repeats: found by the raw text without any preprocessing
+        raw_keys = [self.cache_key("raw", text, top_n) for text in combined_texts]
+        pending = []
+        for i, key in enumerate(raw_keys):
+            cached = prediction_cache.get(key, count_miss=False)
+            if cached is None:
+                pending.append(i)
+            else:
+                results[i] = cached
+        if not pending:
+            return results, clean_by_report
+
+        # 2. Near-identical bugs: same text once scrubbed and preprocessed
+        clean_texts = self.clean_texts([combined_texts[i] for i in pending])
+        to_predict = []
+        for i, clean in zip(pending, clean_texts):
+            clean_by_report[i] = clean
+            key = self.cache_key("clean", clean, top_n)
+            cached = prediction_cache.get(key)
+            if cached is None:
+                to_predict.append((i, clean, key))
+            else:
+                results[i] = cached
+                prediction_cache.set(raw_keys[i], cached)
+        if not to_predict:
+            return results, clean_by_report
+
+        # Transform all remaining texts into a single sparse TF-IDF matrix
+        X = self.vectorizer.transform([clean for _, clean, _ in to_predict])
+
+        # Get probability scores for the whole batch at once
+        probs = self.model.predict_proba(X)
+
+        # Indices of the top_n classes per row, highest confidence first
+        top_indices = np.argsort(probs, axis=1)[:, -top_n:][:, ::-1]
+        top_probs = np.take_along_axis(probs, top_indices, axis=1)
+        top_names = self.encoder.classes_[top_indices]
+
+        for (i, _, key), names, confs in zip(to_predict, top_names, top_probs):
+            row = [
+                {"predicted_developer": name, "confidence": float(conf)}
+                for name, conf in zip(names, confs)
+            ]
+            results[i] = row
+            prediction_cache.set(key, row)
+            prediction_cache.set(raw_keys[i], row)
+        return results, clean_by_report
+
+    @staticmethod
+    def combined_text(title: str, body: str) -> str:
+        return f"{(title or '').strip()} {(body or '').strip()}"
+
+    def clean_texts(self, texts):
+        """Model input for raw texts: assignee names scrubbed, then preprocessed."""
+        if self.scrubber:
+            texts = [self.scrubber.scrub(text) for text in texts]
+        return [preprocess_text(text) for text in texts]
+
+    def cache_key(self, kind: str, text: str, top_n: int) -> str:
+        payload = f"{self.version}\0{top_n}\0{kind}\0{text}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+# Singleton instance. Models are loaded lazily on first use, or in the
+# background when the API starts, so importing this module stays cheap.
+assigner = DeveloperAssigner(autoload=False)
+
+# Background reload of a registry version, surfaced by the admin endpoints
+reload_state = {"version": None, "status": "idle", "error": None}
+_reload_lock = threading.Lock()
+
+def get_assigner() -> DeveloperAssigner:
+    """The live assigner. Callers keep the returned reference for the whole
+    request, so a swap never changes the model under an in-flight prediction."""
+    return assigner
+
+def swap_assigner(new_assigner: DeveloperAssigner) -> DeveloperAssigner:
+    global assigner
+    # Rebinding a module global is atomic; the old instance is freed once
+    # the last in-flight request holding it finishes.
+    old, assigner = assigner, new_assigner
+    # Keys carry the version anyway; clearing just frees the old model's entries
+    prediction_cache.clear()
+    return old
+
+def _load_and_swap(version: str):
+    try:
+        candidate = DeveloperAssigner(autoload=False, bundle_dir=registry.version_dir(version), version=version)
+        candidate.load_models()
+        if candidate.is_ready:
+            swap_assigner(candidate)
+            registry.set_current(version)
+            reload_state.update(status="ready", error=None)
+        else:
+            reload_state.update(status="failed", error=candidate.error)
+    except Exception as e:
+        reload_state.update(status="failed", error=str(e))
+    finally:
+        _reload_lock.release()
+
+def activate_version(version: str) -> bool:
+    """Load a registry version off-thread and swap it in once ready.
+
+    Returns False if another reload is already running.
+    """
+    if not registry.has_version(version):
+        raise ValueError(f"Unknown model version: {version}")
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    reload_state.update(version=version, status="loading", error=None)
+    threading.Thread(target=_load_and_swap, args=(version,), name="model-reload", daemon=True).start()
+    return True
 
 if __name__ == "__main__":
     # Quick test
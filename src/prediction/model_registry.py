@@ -0,0 +1,88 @@
+import datetime
+import json
+import os
+import re
+import sys
+import joblib
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.config import config
+from src.prediction.artifacts import LEGACY_PATHS, MANIFEST_FILE, export_bundle, is_bundle
+
+VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+CURRENT_FILE = "CURRENT"
+
+class ModelRegistry:
+    """Versioned directories, each bundling ensemble, vectorizer and encoder.
+
+    Layout: <root>/<version>/{ensemble_model,vectorizer,label_encoder}.joblib
+    plus manifest.json, and <root>/CURRENT naming the version the API serves.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root or config.MODEL_REGISTRY_DIR)
+
+    def version_dir(self, version: str) -> Path:
+        if not VERSION_RE.match(version or ""):
+            raise ValueError(f"Invalid model version: {version!r}")
+        return self.root / version
+
+    def has_version(self, version: str) -> bool:
+        return is_bundle(self.version_dir(version))
+
+    def list_versions(self):
+        if not self.root.exists():
+            return []
+        current = self.current_version()
+        versions = []
+        for path in sorted(self.root.iterdir()):
+            if not path.is_dir() or not is_bundle(path):
+                continue
+            manifest = {}
+            if (path / MANIFEST_FILE).exists():
+                with open(path / MANIFEST_FILE, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            versions.append({
+                "version": path.name,
+                "created_at": manifest.get("created_at"),
+                "is_current": path.name == current
+            })
+        return versions
+
+    def current_version(self):
+        current_file = self.root / CURRENT_FILE
+        if not current_file.exists():
+            return None
+        version = current_file.read_text(encoding="utf-8").strip()
+        return version if version and self.has_version(version) else None
+
+    def set_current(self, version: str):
+        if not self.has_version(version):
+            raise ValueError(f"Unknown model version: {version}")
+        # Write-then-rename so readers never see a half-written pointer
+        tmp = self.root / f"{CURRENT_FILE}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self.root / CURRENT_FILE)
+
+    def publish(self, model, vectorizer, encoder, version: str = None, metadata: dict = None) -> str:
+        now = datetime.datetime.utcnow()
+        version = version or now.strftime("v%Y%m%d-%H%M%S")
+        target = self.version_dir(version)
+        if target.exists():
+            raise ValueError(f"Model version already exists: {version}")
+        export_bundle(target, model, vectorizer, encoder, {"version": version, "created_at": now.isoformat(), **(metadata or {})})
+        return version
+
+registry = ModelRegistry()
+
+def main():
+    # Publish the latest training outputs as a new version and make it current
+    model, vectorizer, encoder = (joblib.load(LEGACY_PATHS[name]) for name in ("model", "vectorizer", "encoder"))
+    version = registry.publish(model, vectorizer, encoder, version=sys.argv[1] if len(sys.argv) > 1 else None)
+    registry.set_current(version)
+    print(f"Published model version {version} to {registry.version_dir(version)} (now current)")
+    print("Running APIs pick it up via POST /admin/models/{version}/activate")
+
+if __name__ == "__main__":
+    main()
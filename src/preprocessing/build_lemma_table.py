@@ -0,0 +1,73 @@
+import json
+from collections import Counter, defaultdict
+from tqdm import tqdm
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from nltk.corpus import wordnet
+from src.config import config
+from src.preprocessing import nlp_preprocessor
+from src.preprocessing.preprocess_dataset import RAW_DATA_FILE, load_data
+
+# WordNet exception lists (irregular forms), in the order we trust them
+# when the corpus gives no evidence for a word's part of speech.
+EXCEPTION_FILES = ["noun.exc", "verb.exc", "adj.exc", "adv.exc"]
+
+def count_corpus_tags(data):
+    """Count the WordNet POS the NLTK tagger assigns to each cleaned token."""
+    counts = defaultdict(Counter)
+    for item in tqdm(data):
+        text = f"{item.get('title', '') or ''} {item.get('body', '') or ''}"
+        normalized = nlp_preprocessor.normalize_text(text)
+        for word, tag in nlp_preprocessor.tag_tokens(normalized, engine="nltk"):
+            clean_word = "".join(nlp_preprocessor.TOKEN_RE.findall(word))
+            if not clean_word or clean_word in nlp_preprocessor.STOP_WORDS:
+                continue
+            counts[clean_word][nlp_preprocessor.get_wordnet_pos(tag)] += 1
+    return counts
+
+def load_wordnet_exceptions():
+    exceptions = {}
+    for name in EXCEPTION_FILES:
+        with wordnet.open(name) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] not in exceptions:
+                    exceptions[parts[0]] = parts[1]
+    return exceptions
+
+def build_lemma_table(data):
+    lemmas = {}
+
+    # 1. Corpus vocabulary: lemmatize each word with its most frequent tag
+    counts = count_corpus_tags(data)
+    for word, pos_counts in counts.items():
+        pos = pos_counts.most_common(1)[0][0]
+        lemmas[word] = nlp_preprocessor.lemmatizer.lemmatize(word, pos=pos)
+
+    # 2. Irregular forms from WordNet that the corpus never showed us
+    for form, base in load_wordnet_exceptions().items():
+        if "_" not in form and form not in lemmas:
+            lemmas[form] = base
+
+    return lemmas
+
+def main():
+    try:
+        data = load_data()
+    except FileNotFoundError:
+        print(f"No raw corpus at {RAW_DATA_FILE}; building from WordNet exceptions only.")
+        data = []
+
+    lemmas = build_lemma_table(data)
+
+    print(f"Saving {len(lemmas)} lemma entries to {config.LEMMA_TABLE_FILE}...")
+    config.LEMMA_TABLE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(config.LEMMA_TABLE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"source_documents": len(data), "lemmas": lemmas}, f)
+
+    print("Done.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import json
+import random
+import time
+from collections import Counter
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.config import config
+from src.preprocessing import nlp_preprocessor
+from src.preprocessing.preprocess_dataset import load_data
+
+REPORT_FILE = config.BASE_DIR / "docs/reports/preprocessing_engine_equivalence.json"
+SAMPLE_SIZE = 2000
+
+def token_agreement(reference, candidate):
+    """Multiset overlap of two token lists, relative to the longer one."""
+    if not reference and not candidate:
+        return 1.0
+    overlap = sum((Counter(reference) & Counter(candidate)).values())
+    return overlap / max(len(reference), len(candidate))
+
+def run_engine(texts, engine):
+    start = time.perf_counter()
+    outputs = [nlp_preprocessor.preprocess_text(t, engine=engine) for t in texts]
+    return outputs, time.perf_counter() - start
+
+def model_agreement(nltk_outputs, fast_outputs):
+    """Share of documents where the saved model picks the same top developer."""
+    from src.prediction.assign_developer import assigner
+    assigner.ensure_loaded()
+    if not assigner.model or not assigner.vectorizer:
+        return None
+    nltk_pred = assigner.model.predict(assigner.vectorizer.transform(nltk_outputs))
+    fast_pred = assigner.model.predict(assigner.vectorizer.transform(fast_outputs))
+    return float((nltk_pred == fast_pred).mean())
+
+def main():
+    data = load_data()
+    random.seed(42)
+    sample = random.sample(data, min(SAMPLE_SIZE, len(data)))
+    texts = [f"{item.get('title', '') or ''} {item.get('body', '') or ''}" for item in sample]
+
+    # Warm up WordNet and the lemma table so load time is not counted
+    nlp_preprocessor.preprocess_text("warm up", engine="nltk")
+    nlp_preprocessor.preprocess_text("warm up", engine="fast")
+
+    print(f"Preprocessing {len(texts)} documents with both engines...")
+    nltk_outputs, nltk_seconds = run_engine(texts, "nltk")
+    fast_outputs, fast_seconds = run_engine(texts, "fast")
+
+    agreements = []
+    disagreements = Counter()
+    for ref, cand in zip(nltk_outputs, fast_outputs):
+        ref_tokens, cand_tokens = ref.split(), cand.split()
+        agreements.append(token_agreement(ref_tokens, cand_tokens))
+        ref_counts, cand_counts = Counter(ref_tokens), Counter(cand_tokens)
+        disagreements.update((ref_counts - cand_counts) + (cand_counts - ref_counts))
+
+    report = {
+        "documents": len(texts),
+        "nltk_seconds": round(nltk_seconds, 3),
+        "fast_seconds": round(fast_seconds, 3),
+        "speedup": round(nltk_seconds / fast_seconds, 1) if fast_seconds else None,
+        "mean_token_agreement": round(sum(agreements) / len(agreements), 4) if agreements else None,
+        "identical_documents": sum(1 for a, b in zip(nltk_outputs, fast_outputs) if a == b),
+        "top_model_agreement": model_agreement(nltk_outputs, fast_outputs),
+        "most_common_disagreements": disagreements.most_common(25)
+    }
+
+    for key, value in report.items():
+        if key != "most_common_disagreements":
+            print(f"{key}: {value}")
+
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved to {REPORT_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import json
+import re
+from src.utils.helpers import trie_regex
+
+LEAKAGE_TOKEN = "[LEAKAGE_REMOVED]"
+
+class NameScrubber:
+    """Replaces assignee names in bug text so the model can't learn them as labels.
+
+    The blacklist is compiled once into a trie-factored regex, so scrubbing a
+    document is a single scan no matter how many names there are. The same
+    blacklist is saved next to the features and reused at prediction time.
+    """
+
+    def __init__(self, names):
+        self.names = sorted({name.lower() for name in names if name})
+        # \b ensures we don't match substrings of other words (e.g. "ray" in "array")
+        self.pattern = re.compile(r"\b(?:" + trie_regex(self.names) + r")\b", re.IGNORECASE)
+
+    def scrub(self, text: str) -> str:
+        if not text:
+            return ""
+        return self.pattern.sub(LEAKAGE_TOKEN, text.lower())
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.names, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
@@ -1,8 +1,12 @@
 import re
+import json
 import nltk
+from functools import lru_cache
 from nltk.corpus import stopwords, wordnet
 from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
+from src.config import config
+from src.utils.helpers import trie_regex
 
 # Avoid re-downloading
 def download_nltk_resources():
@@ -46,6 +50,45 @@ HEX_RE = re.compile(r"\b0x[a-f0-9]+\b", re.IGNORECASE)
 FILE_PATH_RE = re.compile(r"\b[a-z]:\\[^ \n\t]*|[a-z0-9._/-]+\.[a-z]{2,4}\b", re.IGNORECASE)
 TOKEN_RE = re.compile(r"[a-z0-9_]+")
 
+# Regex normalizers, applied as separate passes in this order. Later passes
+# see the earlier rewrites (a version inside a path is already "version_2_0"
+# when the path pass runs), and the saved vectorizers were fitted on exactly
+# that output, so a combined alternation or a different order is not a
+# drop-in replacement.
+NORMALIZERS = [
+    (VERSION_RE, lambda m: f"version_{m.group(0).replace('.', '_').replace('v', '')}"),
+    (HOTKEY_RE, lambda m: f"hotkey_{m.group(0).replace('+', '_')}"),
+    (HEX_RE, lambda m: "hex_code"),
+    (FILE_PATH_RE, lambda m: "file_path"),
+]
+
+TERM_MAP = {}
+TERM_RE = None
+
+# Fast engine tokenizer: mimics word_tokenize closely enough for our pipeline.
+# Splits on whitespace and on the punctuation Treebank splits off, and
+# separates clitics ("do" + "n't", "user" + "'s") the same way.
+FAST_TOKEN_RE = re.compile(r"[a-z0-9_]+(?=n't\b)|n't\b|'(?:s|re|ve|ll|d|m)\b|[^\s,;:!?()\[\]{}<>\"'`]+")
+
+ADJ_SUFFIXES = ("able", "ible", "ous", "ful", "less", "ive", "ic", "al")
+
+_lemma_table = None
+
+def register_terms(mapping):
+    """Add {"term": "replacement"} entries and recompile the term scanner."""
+    global TERM_RE
+    TERM_MAP.update({k.lower(): v for k, v in mapping.items()})
+    TERM_RE = re.compile(trie_regex(TERM_MAP))
+
+def load_term_map():
+    register_terms(PRODUCT_MAP)
+    register_terms(LANGUAGE_MAP)
+    if config.TERM_MAP_FILE:
+        with open(config.TERM_MAP_FILE, "r", encoding="utf-8") as f:
+            register_terms(json.load(f))
+
+load_term_map()
+
 def get_wordnet_pos(treebank_tag):
     if treebank_tag.startswith('J'): return wordnet.ADJ
     elif treebank_tag.startswith('V'): return wordnet.VERB
@@ -53,37 +96,91 @@ def get_wordnet_pos(treebank_tag):
     elif treebank_tag.startswith('R'): return wordnet.ADV
     else: return wordnet.NOUN
 
-def preprocess_text(text: str) -> str:
-    if not text:
+def guess_treebank_tag(word):
+    """Cheap suffix-based stand-in for nltk.pos_tag on words missing from the lemma table."""
+    if word.endswith("ing") or word.endswith("ed"): return "VB"
+    elif word.endswith("ly"): return "RB"
+    elif word.endswith(ADJ_SUFFIXES): return "JJ"
+    else: return "NN"
+
+def load_lemma_table():
+    """Load the precomputed word -> lemma table built by build_lemma_table.py."""
+    global _lemma_table
+    if _lemma_table is None:
+        try:
+            with open(config.LEMMA_TABLE_FILE, "r", encoding="utf-8") as f:
+                _lemma_table = json.load(f)["lemmas"]
+        except FileNotFoundError:
+            print(f"Lemma table not found at {config.LEMMA_TABLE_FILE}; fast engine will lemmatize every token")
+            _lemma_table = {}
+    return _lemma_table
+
+def tag_tokens(text: str, engine: str = None):
+    """Tokenize and POS-tag normalized text. The fast engine leaves tags as None."""
+    engine = engine or config.PREPROCESSING_ENGINE
+    if engine == "fast":
+        return [(tok, None) for tok in FAST_TOKEN_RE.findall(text)]
+    return nltk.pos_tag(word_tokenize(text))
+
+def lemmatize_word(word, tag):
+    if tag is None:
+        lemma = load_lemma_table().get(word)
+        if lemma is not None:
+            return lemma
+        tag = guess_treebank_tag(word)
+    return lemmatizer.lemmatize(word, pos=get_wordnet_pos(tag))
+
+@lru_cache(maxsize=config.LEMMA_CACHE_SIZE)
+def process_token(word, tag):
+    """Clean, filter and lemmatize one tagged token. Returns "" for dropped tokens.
+
+    Bug reports repeat the same vocabulary constantly, so results are kept in a
+    bounded LRU cache shared by preprocess_text and generate_tags.
+    """
+    clean_word = "".join(TOKEN_RE.findall(word))
+    if not clean_word or clean_word in STOP_WORDS:
         return ""
 
+    lemma = lemmatize_word(clean_word, tag)
+
+    if len(lemma) > 1 or lemma.isdigit():
+        return lemma
+    return ""
+
+def lemma_cache_stats():
+    info = process_token.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0
+    }
+
+def normalize_text(text: str) -> str:
+    """Lowercase and rewrite product names, versions, hotkeys, hex codes and paths."""
     text = text.lower()
 
-    for k, v in PRODUCT_MAP.items():
-        text = text.replace(k, v)
-        
-    for k, v in LANGUAGE_MAP.items():
-        text = text.replace(k, v)
+    # 1. Product/language names: one scan over a trie-compiled literal regex
+    text = TERM_RE.sub(lambda m: TERM_MAP[m.group(0)], text)
 
-    text = VERSION_RE.sub(lambda m: f"version_{m.group(0).replace('.', '_').replace('v', '')}", text)
-    text = HOTKEY_RE.sub(lambda m: f"hotkey_{m.group(0).replace('+', '_')}", text)
-    text = HEX_RE.sub("hex_code", text)
-    text = FILE_PATH_RE.sub("file_path", text)
+    # 2. Versions, hotkeys, hex codes and paths, in the order the models were trained on
+    for pattern, rewrite in NORMALIZERS:
+        text = pattern.sub(rewrite, text)
+    return text
 
-    tokens = word_tokenize(text)
-    pos_tags = nltk.pos_tag(tokens)
+def preprocess_text(text: str, engine: str = None) -> str:
+    if not text:
+        return ""
+
+    pos_tags = tag_tokens(normalize_text(text), engine)
 
     processed_tokens = []
 
     for word, tag in pos_tags:
-        clean_word = "".join(TOKEN_RE.findall(word))
-        if not clean_word or clean_word in STOP_WORDS:
-            continue
-            
-        wn_tag = get_wordnet_pos(tag)
-        lemma = lemmatizer.lemmatize(clean_word, pos=wn_tag)
-        
-        if len(lemma) > 1 or lemma.isdigit():
+        lemma = process_token(word, tag)
+        if lemma:
             processed_tokens.append(lemma)
 
     return " ".join(processed_tokens)
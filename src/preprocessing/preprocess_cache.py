@@ -0,0 +1,82 @@
+import hashlib
+import inspect
+import json
+import sqlite3
+from src.config import config
+from src.preprocessing import nlp_preprocessor
+
+def preprocessor_version() -> str:
+    """Fingerprint everything that can change preprocess_text output for a given input.
+
+    Covers the preprocessing source code, the term maps, stop words, and the
+    selected engine and lemma table. Any change yields a new version, so stale
+    cache entries are never served. The name blacklist is not part of it:
+    entries are keyed on the already scrubbed text, so a new name only misses
+    for the documents it actually appears in.
+    """
+    h = hashlib.sha256()
+    h.update(inspect.getsource(nlp_preprocessor).encode("utf-8"))
+    h.update(json.dumps(nlp_preprocessor.TERM_MAP, sort_keys=True).encode("utf-8"))
+    h.update(" ".join(sorted(nlp_preprocessor.STOP_WORDS)).encode("utf-8"))
+    h.update(config.PREPROCESSING_ENGINE.encode("utf-8"))
+    if config.PREPROCESSING_ENGINE == "fast" and config.LEMMA_TABLE_FILE.exists():
+        h.update(config.LEMMA_TABLE_FILE.read_bytes())
+    return h.hexdigest()[:16]
+
+class PreprocessCache:
+    """On-disk map of hash(scrubbed text, preprocessor version) -> processed text.
+
+    Entries written under an older preprocessor version are purged when the
+    cache is opened, so the file only ever holds reusable results.
+    """
+
+    def __init__(self, path, version: str):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS preprocessed ("
+            " key TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " combined_text TEXT NOT NULL)"
+        )
+        self.conn.execute("DELETE FROM preprocessed WHERE version != ?", (version,))
+        self.conn.commit()
+
+    def key(self, scrubbed_text: str) -> str:
+        payload = f"{self.version}\0{scrubbed_text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys) -> dict:
+        found = {}
+        keys = list(keys)
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, combined_text FROM preprocessed WHERE key IN ({placeholders})", batch
+            )
+            found.update(rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO preprocessed (key, version, combined_text) VALUES (?, ?, ?)",
+            ((key, self.version, text) for key, text in items)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,5 +1,5 @@
-import json
-import re
+from functools import lru_cache
+from multiprocessing import Pool
 from pathlib import Path
 from tqdm import tqdm
 import sys
@@ -7,76 +7,132 @@ import os
 
 # Add src to path to import nlp_preprocessor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.config import config
 from src.preprocessing import nlp_preprocessor
+from src.preprocessing.name_scrubber import NameScrubber
+from src.preprocessing.preprocess_cache import PreprocessCache, preprocessor_version
+from src.utils.helpers import chunked, iter_records, resolve_data_file, write_records
 
 BASE_DIR = Path(__file__).resolve().parents[2]
-RAW_DATA_FILE = BASE_DIR / "data/raw/github_issues_raw.json"
-OUTPUT_FILE = BASE_DIR / "data/processed/bug_reports_nlp_ready.json"
+RAW_DATA_FILE = config.RAW_DATA_FILE
+OUTPUT_FILE = config.PROCESSED_DATA_FILE
+
+def iter_data():
+    """Stream raw issues one at a time (JSONL, or a legacy JSON array)."""
+    return iter_records(RAW_DATA_FILE)
 
 def load_data():
-    print(f"Loading raw data from {RAW_DATA_FILE}...")
-    with open(RAW_DATA_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    print(f"Loading raw data from {resolve_data_file(RAW_DATA_FILE)}...")
+    return list(iter_data())
 
 def get_assignee_blacklist(data):
     assignees = set()
+    total = 0
     for item in data:
+        total += 1
         if item.get('assignee'):
             assignees.add(item['assignee'].lower())
-    print(f"Found {len(assignees)} unique assignees to blacklist.")
+    print(f"Found {len(assignees)} unique assignees to blacklist across {total} issues.")
     return assignees
 
+@lru_cache(maxsize=4)
+def _scrubber_for(blacklist):
+    return NameScrubber(blacklist)
+
 def remove_names(text, blacklist):
-    if not text:
-        return ""
-    
-    # Simple strategy: Replace names with generic token or empty string
-    # We accept that this might break some sentences, but it removes leakage.
-    # We iterate over the blacklist. For efficiency, we could use a single regex.
-    
-    # Sort by length descending to replace longer names first (if any overlaps)
-    sorted_names = sorted(list(blacklist), key=len, reverse=True)
-    
-    # Escape names for regex
-    escaped_names = [re.escape(name) for name in sorted_names]
-    
-    # Create a giant regex: \b(name1|name2|...)\b
-    # \b ensures we don't match substrings of other words (e.g. "ray" in "array")
-    pattern = r'\b(?:' + '|'.join(escaped_names) + r')\b'
+    # Replace names with a generic token. We accept that this might break some
+    # sentences, but it removes leakage. The regex is compiled once per blacklist.
+    scrubber = blacklist if isinstance(blacklist, NameScrubber) else _scrubber_for(frozenset(blacklist))
+    return scrubber.scrub(text)
+
+def scrub_item(item, scrubber):
+    """Title and body as one string, with assignee names removed (prevents label leakage)."""
+    title = item.get('title', '') or ''
+    body = item.get('body', '') or ''
+    return scrubber.scrub(f"{title} {body}")
+
+def process_text(item, scrubber):
+    # 1. Clean Leakage
+    clean_text = scrub_item(item, scrubber)
     
-    # Case insensitive replacement
-    return re.sub(pattern, "[LEAKAGE_REMOVED]", text.lower(), flags=re.IGNORECASE)
+    # 2. NLP Preprocessing
+    return nlp_preprocessor.preprocess_text(clean_text)
+
+def _process_chunk(texts):
+    # Workers get already scrubbed text; NLTK resources load when they import this module
+    return [nlp_preprocessor.preprocess_text(text) for text in texts]
+
+def preprocess_records(data, scrubber, workers=1, chunk_size=200, cache=None):
+    """Yield processed reports in input order, using a process pool when workers > 1.
+
+    `data` can be any iterable of raw issues, so this stage can be chained
+    directly onto a streaming reader. Names are scrubbed here (one regex scan
+    per issue); with a PreprocessCache, only issues whose scrubbed text changed
+    since the last run are sent through the NLP pipeline.
+    """
+    workers = max(1, workers)
+    pool = Pool(workers) if workers > 1 else None
+    progress = tqdm(total=len(data) if hasattr(data, "__len__") else None)
+
+    try:
+        # Each batch keeps every worker busy with several chunks
+        for batch in chunked(data, chunk_size * workers * 4):
+            clean_texts = [scrub_item(item, scrubber) for item in batch]
+            keys = [cache.key(text) for text in clean_texts] if cache else []
+            cached = cache.get_many(keys) if cache else {}
+            todo = [i for i in range(len(batch)) if not cache or keys[i] not in cached]
+
+            pending = [clean_texts[i] for i in todo]
+            if pool:
+                # map keeps output order deterministic regardless of which worker finishes first
+                texts = [t for chunk in pool.map(_process_chunk, list(chunked(pending, chunk_size))) for t in chunk]
+            else:
+                texts = _process_chunk(pending)
+
+            results = dict(zip(todo, texts))
+            if cache:
+                cache.put_many((keys[i], text) for i, text in results.items())
+
+            for i, item in enumerate(batch):
+                final_tokens = results[i] if i in results else cached[keys[i]]
+                if final_tokens.strip():
+                    yield {
+                        "issue_id": item.get("issue_id"),
+                        "assignee": item.get("assignee"),
+                        "combined_text": final_tokens
+                    }
+            progress.update(len(batch))
+    finally:
+        progress.close()
+        if pool:
+            pool.close()
+            pool.join()
 
 def main():
-    data = load_data()
-    blacklist = get_assignee_blacklist(data)
-    
-    processed_data = []
+    # Two streaming passes: collect the blacklist first, then process.
+    # Neither pass holds the whole corpus in memory.
+    print(f"Streaming raw data from {resolve_data_file(RAW_DATA_FILE)}...")
+    scrubber = NameScrubber(get_assignee_blacklist(iter_data()))
+    scrubber.save(config.NAME_BLACKLIST_FILE)
     
-    print("Preprocessing descriptions (removing names + NLP pipeline)...")
-    for item in tqdm(data):
-        title = item.get('title', '') or ''
-        body = item.get('body', '') or ''
-        full_text = f"{title} {body}"
-        
-        # 1. Clean Leakage
-        clean_text = remove_names(full_text, blacklist)
-        
-        # 2. NLP Preprocessing
-        final_tokens = nlp_preprocessor.preprocess_text(clean_text)
-        
-        if final_tokens.strip():
-            processed_data.append({
-                "issue_id": item.get("issue_id"),
-                "assignee": item.get("assignee"),
-                "combined_text": final_tokens
-            })
-            
-    print(f"Saving {len(processed_data)} processed reports to {OUTPUT_FILE}...")
+    workers = max(1, config.PREPROCESS_WORKERS)
+    print(f"Preprocessing descriptions (removing names + NLP pipeline) with {workers} worker(s)...")
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(processed_data, f, indent=4)
+
+    cache = None
+    if config.PREPROCESS_CACHE_ENABLED:
+        cache = PreprocessCache(config.PREPROCESS_CACHE_FILE, preprocessor_version())
+
+    # Results are written as each chunk completes instead of held in memory
+    try:
+        processed = preprocess_records(iter_data(), scrubber, workers, config.PREPROCESS_CHUNK_SIZE, cache)
+        count = write_records(OUTPUT_FILE, processed)
+    finally:
+        if cache:
+            print(f"Preprocess cache: {cache.hits} reused, {cache.misses} processed (version {cache.version})")
+            cache.close()
         
+    print(f"Saved {count} processed reports to {OUTPUT_FILE}.")
     print("Done.")
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+import re
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+def trie_regex(words) -> str:
+    """Build a regex alternation for literal words, factored as a prefix trie.
+
+    Python's re tries alternatives one by one at every position, so a flat
+    "a|b|c|..." pattern gets slower with every entry. Sharing prefixes keeps
+    matching close to linear in the text even with hundreds of words, and the
+    greedy optional groups make the longest word win at a given position.
+    """
+    trie = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    if not trie:
+        return r"(?!)"  # matches nothing
+    return _trie_pattern(trie)
+
+def _trie_pattern(node) -> str:
+    is_end = "" in node
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not is_end:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if is_end else pattern
+
+def normalize_title(title: str) -> str:
+    """Case- and whitespace-insensitive form of a bug title, used for duplicate detection."""
+    return " ".join((title or "").lower().split())
+
+def title_hash(title: str) -> str:
+    """Fixed-width key of the normalized title; short enough to index cheaply."""
+    return hashlib.sha256(normalize_title(title).encode("utf-8")).hexdigest()[:16]
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items from any iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def write_json_array(path, records) -> int:
+    """Stream records into a JSON array file as they are produced. Returns the count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(record))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+def resolve_data_file(path):
+    """Fall back to the legacy .json / new .jsonl sibling when `path` doesn't exist."""
+    path = Path(path)
+    if not path.exists():
+        sibling = path.with_suffix(".json" if path.suffix == ".jsonl" else ".jsonl")
+        if sibling.exists():
+            return sibling
+    return path
+
+def iter_records(path):
+    """Yield records one at a time from a .jsonl file, or from a legacy .json array."""
+    path = resolve_data_file(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix != ".jsonl":
+            # JSON arrays can't be streamed with the stdlib parser
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def write_records(path, records) -> int:
+    """Stream records to `path`: one JSON object per line for .jsonl, else a JSON array."""
+    path = Path(path)
+    if path.suffix != ".jsonl":
+        return write_json_array(path, records)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write("\n")
+            count += 1
+    return count
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Keeps hit/miss counters so callers can report a hit rate.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None, count_miss: bool = True):
+        # count_miss=False for a first-chance lookup that falls back to another key
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                if count_miss:
+                    self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
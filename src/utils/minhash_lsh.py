@@ -0,0 +1,101 @@
+import threading
+import zlib
+import numpy as np
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+def shingles(tokens, size: int = 2) -> set:
+    """Word n-grams of a token list; short texts fall back to their single tokens."""
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+class MinHasher:
+    """MinHash signatures: the estimated Jaccard similarity of two shingle sets
+    is the fraction of positions where their signatures agree."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        # Fixed seed: signatures stored in the database stay comparable across runs.
+        # a and b range over the whole field: with a < 2**32, a * x + b rarely
+        # reaches p, the hash is then just increasing in x, and every
+        # permutation picks the same minimum shingle.
+        self.a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set) -> np.ndarray:
+        if not shingle_set:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+        # a * x wraps around 2**64 before the modulo; that only mixes the bits further
+        hashed = (np.outer(x, self.a) + self.b) % _PRIME
+        return (hashed.min(axis=0) & _MAX_HASH).astype(np.uint32)
+
+def jaccard_estimate(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.mean(sig_a == sig_b))
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures.
+
+    Each signature is cut into `bands` slices; items sharing any slice become
+    candidates. A query costs one dict lookup per band plus a signature
+    comparison per candidate, independent of how many items are indexed.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def _band_keys(self, sig: np.ndarray):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, sig: np.ndarray):
+        with self._lock:
+            if key in self.signatures:
+                self._remove(key)
+            self.signatures[key] = sig
+            for bucket, band_key in zip(self._buckets, self._band_keys(sig)):
+                bucket.setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        sig = self.signatures.pop(key, None)
+        if sig is None:
+            return
+        for bucket, band_key in zip(self._buckets, self._band_keys(sig)):
+            members = bucket.get(band_key)
+            if members:
+                members.discard(key)
+                if not members:
+                    del bucket[band_key]
+
+    def query(self, sig: np.ndarray, threshold: float = 0.0, exclude=None, limit: int = None):
+        """(key, estimated Jaccard) pairs at or above `threshold`, most similar first."""
+        with self._lock:
+            candidates = set()
+            for bucket, band_key in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(bucket.get(band_key, ()))
+            candidates.discard(exclude)
+            scored = [(key, jaccard_estimate(sig, self.signatures[key])) for key in candidates]
+        scored = [pair for pair in scored if pair[1] >= threshold]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:limit] if limit else scored
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, key):
+        return key in self.signatures
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Everything runs against a scratch SQLite file and model registry; the
+# settings must be in place before the app (and config) is first imported
+TMP_DIR = Path(tempfile.mkdtemp(prefix="bug_triaging_tests_"))
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR / 'test.db'}"
+os.environ["MODEL_REGISTRY_DIR"] = str(TMP_DIR / "registry")
+os.environ["MODEL_BUNDLE_DIR"] = str(TMP_DIR / "no_bundle")
+os.environ["NAME_BLACKLIST_FILE"] = str(TMP_DIR / "no_blacklist.json")
+# Keep inference in-process: no worker pool to fork under pytest
+os.environ["API_INFERENCE_EXECUTOR"] = "thread"
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+TRAINING_DATA = [
+    ("terminal shell crash bash command", "alice"),
+    ("terminal powershell hang console", "alice"),
+    ("editor syntax highlight broken theme", "bob"),
+    ("editor cursor jump theme color", "bob"),
+    ("git push fail github repo", "carol"),
+    ("git merge conflict branch github", "carol"),
+]
+
+def publish_test_model():
+    """Tiny TF-IDF + logistic regression model, published as the registry's current version."""
+    from src.prediction.model_registry import registry
+    texts, labels = zip(*TRAINING_DATA)
+    vectorizer = TfidfVectorizer()
+    encoder = LabelEncoder()
+    model = LogisticRegression(max_iter=200)
+    model.fit(vectorizer.fit_transform(texts), encoder.fit_transform(labels))
+    version = registry.publish(model, vectorizer, encoder, version="test")
+    registry.set_current(version)
+
+@pytest.fixture(scope="session")
+def app_client():
+    from fastapi.testclient import TestClient
+    publish_test_model()
+    from api.app import app
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 30
+        while not client.get("/health").json().get("model_loaded"):
+            assert time.monotonic() < deadline, "model did not load"
+            time.sleep(0.1)
+        yield client
+
+@pytest.fixture(params=["async", "threaded"])
+def client(request, app_client, monkeypatch):
+    """The API, once on the async engine (aiosqlite) and once on the DB thread pool."""
+    if request.param == "async":
+        from database.db_connection import get_async_session_factory
+        if get_async_session_factory() is None:
+            pytest.skip("aiosqlite / greenlet not installed")
+    else:
+        monkeypatch.setattr("api.crud_async.get_async_session_factory", lambda: None)
+    return app_client
+
+@pytest.fixture
+def db():
+    from database.db_connection import SessionLocal
+    session = SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,165 @@
+import datetime
+import uuid
+from api import models
+
+def new_bug(client, title=None, body="The terminal crashes when running a bash command"):
+    title = title or f"Terminal crash {uuid.uuid4().hex[:8]}"
+    response = client.post("/predict", json={"title": title, "body": body})
+    assert response.status_code == 200, response.text
+    return response.json()["bug_id"]
+
+def test_predict_stores_bug_with_prediction(client):
+    response = client.post("/predict", json={"title": "Terminal hangs", "body": "powershell console hangs on start"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["bug_id"]
+    assert result["predictions"][0]["predicted_developer"] == "alice"
+    assert [p["confidence"] for p in result["predictions"]] == sorted(
+        [p["confidence"] for p in result["predictions"]], reverse=True
+    )
+
+    stored = client.get(f"/bugs/{result['bug_id']}/predictions")
+    assert stored.status_code == 200
+    assert stored.json()["predictions"] == result["predictions"]
+
+def test_predict_batch(client):
+    bugs = [
+        {"title": "Editor theme broken", "body": "syntax highlight color wrong"},
+        {"title": "Git push fails", "body": "cannot push branch to github repo"},
+    ]
+    response = client.post("/predict/batch", json={"bugs": bugs})
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["total"], result["processed_count"], result["error_count"]) == (2, 2, 0)
+    assert [r["predictions"][0]["predicted_developer"] for r in result["results"]] == ["bob", "carol"]
+    assert len({r["bug_id"] for r in result["results"]}) == 2
+
+def test_bugs_keyset_paging(client):
+    for _ in range(7):
+        new_bug(client)
+    full = client.get("/bugs", params={"limit": 1000}).json()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/bugs", params=params)
+        assert response.status_code == 200
+        seen += [bug["id"] for bug in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [bug["id"] for bug in full]
+    keys = [(bug["created_at"], bug["id"]) for bug in full]
+    assert keys == sorted(keys, reverse=True)
+
+def test_bugs_paging_over_legacy_timestamps(client, db):
+    from sqlalchemy import text
+    from database.db_connection import _normalize_bug_timestamps, engine
+    # As stored by raw SQL or the old CURRENT_TIMESTAMP default: no fractional seconds
+    for i in range(3):
+        db.execute(text(
+            "INSERT INTO bugs (title, body, priority, source, status, created_at, updated_at) "
+            "VALUES (:title, 'legacy', 'medium', 'manual', 'open', '2001-01-01 10:00:00', '2001-01-01 10:00:00')"
+        ), {"title": f"Legacy bug {uuid.uuid4().hex[:8]}"})
+    db.commit()
+    with engine.begin() as conn:
+        _normalize_bug_timestamps(conn)
+
+    total = len(client.get("/bugs", params={"limit": 1000}).json())
+    seen, cursor = [], None
+    for _ in range(total + 1):
+        response = client.get("/bugs", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += [bug["id"] for bug in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert cursor is None
+    assert len(seen) == len(set(seen)) == total
+
+def test_bugs_bad_cursor(client):
+    assert client.get("/bugs", params={"cursor": "not-a-cursor"}).status_code == 400
+
+def test_bugs_tag_filter_is_literal(client):
+    bug_id = new_bug(client)
+    tag = client.get("/bugs", params={"limit": 1}).json()[0]["tags"].split(",")[0]
+    assert bug_id in [bug["id"] for bug in client.get("/bugs", params={"tag": tag, "limit": 1000}).json()]
+    # LIKE wildcards in the tag must not match everything
+    assert client.get("/bugs", params={"tag": "%"}).json() == []
+    assert client.get("/bugs", params={"tag": "_"}).json() == []
+
+def test_similar_bugs(client):
+    body = "opening the integrated terminal with a custom bash profile crashes the whole window every time"
+    first = new_bug(client, body=body)
+    second = new_bug(client, body=body)
+
+    response = client.get(f"/bugs/{second}/similar")
+    assert response.status_code == 200
+    similar = {match["bug_id"]: match["similarity"] for match in response.json()["similar"]}
+    assert first in similar
+    assert second not in similar
+
+    assert client.get("/bugs/999999999/similar").status_code == 404
+
+def test_delete_bug_cascades(client, db):
+    bug_id = new_bug(client)
+    assert client.delete(f"/bugs/{bug_id}").status_code == 200
+    assert client.delete(f"/bugs/{bug_id}").status_code == 404
+
+    for model in (models.ModelPrediction, models.BugAssignment):
+        assert db.query(model).filter(model.bug_id == bug_id).count() == 0
+    assert db.get(models.BugSignature, bug_id) is None
+
+def test_bulk_delete(client):
+    bug_ids = [new_bug(client) for _ in range(3)]
+    response = client.post("/bugs/bulk-delete", json={"bug_ids": bug_ids + [999999999]})
+    assert response.status_code == 200
+    assert "deleted 3 bugs" in response.json()["message"]
+    listed = {bug["id"] for bug in client.get("/bugs", params={"limit": 1000}).json()}
+    assert listed.isdisjoint(bug_ids)
+
+def test_bulk_delete_archive(client, db):
+    bug_ids = [new_bug(client) for _ in range(2)]
+    response = client.post("/bugs/bulk-delete", json={"bug_ids": bug_ids, "archive": True})
+    assert response.status_code == 200
+    assert "archived 2 bugs" in response.json()["message"]
+
+    assert db.query(models.Bug).filter(models.Bug.id.in_(bug_ids)).count() == 0
+    archived = db.query(models.ArchivedBug).filter(models.ArchivedBug.bug_id.in_(bug_ids)).all()
+    assert sorted(row.bug_id for row in archived) == sorted(bug_ids)
+    assert all(row.assigned_developer == "alice" for row in archived)
+
+def test_archive_old_closed_bugs(client, db):
+    stale, recent = new_bug(client), new_bug(client)
+    long_ago = datetime.datetime.utcnow() - datetime.timedelta(days=400)
+    db.query(models.Bug).filter(models.Bug.id == stale).update({"status": "closed", "updated_at": long_ago})
+    db.query(models.Bug).filter(models.Bug.id == recent).update({"status": "closed"})
+    db.commit()
+
+    response = client.post("/bugs/archive", json={"older_than_days": 90})
+    assert response.status_code == 200
+    assert response.json()["archived_count"] == 1
+    db.expire_all()
+    assert db.get(models.Bug, stale) is None
+    assert db.get(models.Bug, recent) is not None
+
+def test_archived_bug_ids_are_not_reused(client, db):
+    # The archived bug is the newest row, so plain rowid allocation would hand its id out again
+    archived_id = new_bug(client)
+    assert client.post("/bugs/bulk-delete", json={"bug_ids": [archived_id], "archive": True}).status_code == 200
+    new_id = new_bug(client)
+    assert new_id > archived_id
+    assert db.query(models.ArchivedBug).filter(models.ArchivedBug.bug_id == new_id).count() == 0
+
+    deleted_id = new_id
+    assert client.delete(f"/bugs/{deleted_id}").status_code == 200
+    assert new_bug(client) > deleted_id
+
+def test_similarity_index_picks_up_rows_committed_out_of_order(client, db):
+    from api.similarity import similarity_index
+    earlier, later = new_bug(client), new_bug(client)
+    # As if `earlier` had committed after `later` was already indexed
+    similarity_index.remove_many([earlier])
+    similarity_index.refresh(db)
+    assert similarity_index.last_bug_id >= later
+    assert earlier in similarity_index.lsh
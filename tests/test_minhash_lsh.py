@@ -0,0 +1,21 @@
+import random
+from src.utils.minhash_lsh import LSHIndex, MinHasher, jaccard_estimate, shingles
+
+def test_signature_agreement_tracks_jaccard():
+    rng = random.Random(7)
+    hasher = MinHasher(64)
+    for _ in range(200):
+        shared = [f"w{rng.randrange(10**6)}" for _ in range(15)]
+        a = shingles([f"a{rng.randrange(10**6)}"] + shared, 2)
+        b = shingles([f"b{rng.randrange(10**6)}"] + shared, 2)
+        true = len(a & b) / len(a | b)
+        assert abs(jaccard_estimate(hasher.signature(a), hasher.signature(b)) - true) < 0.3
+
+def test_lsh_finds_near_duplicates():
+    hasher = MinHasher(64)
+    index = LSHIndex(64, 16)
+    base = "opening the integrated terminal with a custom bash profile crashes the whole window".split()
+    for i in range(50):
+        index.add(i, hasher.signature(shingles([f"title{i}"] + base, 2)))
+    matches = index.query(hasher.signature(shingles(["query"] + base, 2)), threshold=0.5)
+    assert len(matches) == 50
@@ -0,0 +1,58 @@
+import random
+from src.preprocessing.nlp_preprocessor import (
+    FILE_PATH_RE, HEX_RE, HOTKEY_RE, LANGUAGE_MAP, PRODUCT_MAP, VERSION_RE, normalize_text
+)
+
+def reference_normalize_text(text: str) -> str:
+    """normalize_text as the saved models were trained on it: one pass per term and pattern."""
+    text = text.lower()
+    for k, v in PRODUCT_MAP.items():
+        text = text.replace(k, v)
+    for k, v in LANGUAGE_MAP.items():
+        text = text.replace(k, v)
+    text = VERSION_RE.sub(lambda m: f"version_{m.group(0).replace('.', '_').replace('v', '')}", text)
+    text = HOTKEY_RE.sub(lambda m: f"hotkey_{m.group(0).replace('+', '_')}", text)
+    text = HEX_RE.sub("hex_code", text)
+    text = FILE_PATH_RE.sub("file_path", text)
+    return text
+
+# Pieces that overlap between the patterns: versions inside hotkeys and paths,
+# hex codes with extensions, product names next to dotted words
+FRAGMENTS = [
+    "ctrl", "shift", "alt", "cmd", "meta", "v", "1", "2.0", "1.2.3", "v1.2", "10", "0x1f", "0xdeadbeef",
+    "js", "json", "txt", "py", "c:\\users\\me", "src/app", "node.js", "vue.js", ".net", "asp", "c++", "c#",
+    "f#", "vs code", "visual studio code", "VS Code", "crash", "error", "key", "a", "Z", "x",
+]
+SEPARATORS = [" ", " ", " ", "", "+", ".", "/", "\\", "-", "_", ",", "\n"]
+
+def fixed_corpus(size=5000, seed=1234):
+    rng = random.Random(seed)
+    docs = ["ctrl+1.2.3 pressed", "shift+v1.2", "crash in app-2.0.js", "ctrl+shift+p opens vs code",
+            "error 0x1f.txt in c:\\temp\\log.txt", "upgrade asp.net to v4.5.1 and node.js 18.2"]
+    for _ in range(size):
+        parts = [rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8))]
+        docs.append("".join(part + rng.choice(SEPARATORS) for part in parts))
+    return docs
+
+def test_normalize_text_matches_training_implementation():
+    mismatches = [doc for doc in fixed_corpus() if normalize_text(doc) != reference_normalize_text(doc)]
+    assert mismatches == []
+
+def test_preprocess_cache_reuses_documents_a_new_blacklist_name_does_not_touch(tmp_path):
+    from src.preprocessing.name_scrubber import NameScrubber
+    from src.preprocessing.preprocess_cache import PreprocessCache, preprocessor_version
+    from src.preprocessing.preprocess_dataset import preprocess_records
+
+    issues = [
+        {"issue_id": 1, "assignee": "alice", "title": "Crash on start", "body": "reported to alice"},
+        {"issue_id": 2, "assignee": "bob", "title": "Terminal hangs", "body": "bob can reproduce it"},
+        {"issue_id": 3, "assignee": None, "title": "Theme colors wrong", "body": "editor looks broken"},
+    ]
+    with PreprocessCache(tmp_path / "cache.sqlite", preprocessor_version()) as cache:
+        list(preprocess_records(issues, NameScrubber(["alice"]), cache=cache))
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        # Adding "bob" only changes the scrubbed text of issue 2
+        second_run = list(preprocess_records(issues, NameScrubber(["alice", "bob"]), cache=cache))
+        assert (cache.hits, cache.misses) == (2, 4)
+        assert "bob" not in second_run[1]["combined_text"]